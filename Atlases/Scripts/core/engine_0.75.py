@@ -1,7 +1,29 @@
 import pygame
+import os
 import sys
 import random
 import math
+import numpy as np
+
+#* Shared engine modules live in gamelib.daring at the repository root.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+from gamelib.daring.spatial_hash import SlotHash
+from gamelib.daring import narrowphase
+from gamelib.daring.commands import CommandBuffer, EntityList
+from gamelib.daring.contact_events import ContactEvents, ENTER, EXIT
+from gamelib.daring.contact_solver import ContactSolver
+from gamelib.daring.determinism import SimClock, TickHashes
+from gamelib.daring.puck_world import (PuckWorld, PuckView, SlotSet, KIND_PUCK, KIND_STATIC, KIND_SHOOTER, KIND_ICE,
+                                       KIND_COUNT, REST_STOP, REST_DEACTIVATE)
+from gamelib.daring.dirty_rects import DirtyRenderer
+from gamelib.daring.layers import LayerMatrix
+from gamelib.daring.mask_cache import circle_mask, rect_mask
+from gamelib.daring.pool import Pool
+from gamelib.daring.profiler import Profiler
+from gamelib.daring.sprite_atlas import get_atlas
+from gamelib.daring.static_layer import StaticLayer
+from gamelib.daring.tracer import get_tracer
+from gamelib.daring.zone_effects import ZoneEffects, EFFECT_KILL, EFFECT_FRICTION, EFFECT_BOOST, EFFECT_CONTACT
 
 # TODO: Revise all graphics to use OpenGL***
 
@@ -34,9 +56,6 @@ Daring Ducks - Game Engine:
 - Advanced input params for each class, easy to manipulate for debugging purposes.
 """
 
-#* Initialization
-pygame.init()
-
 """
 Constants:
 vvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
@@ -52,6 +71,17 @@ MIN_VELOCITY_THRESHOLD_2 = 12.0  #
 MIN_VELOCITY_THRESHOLD_3 = 20.0  #
 PUCK_COUNT = 3                   #
 MAX_LIVES = 10                   #
+SLEEP_AFTER = 4.0                # Resting time (dt units) before static pucks and ice cubes go to sleep
+SOLVER_ITERATIONS = 8            # Contact solver passes per frame, more settles piles faster
+#* Deterministic mode: fixed dt, simulated clock, seeded randomness and a state hash per tick for replays
+DETERMINISTIC = bool(os.environ.get('DARING_DETERMINISTIC'))
+SEED = 1                         # Seed of rng in deterministic mode
+HASH_LOG = os.environ.get('DARING_HASH_LOG')  # Per tick state hashes, compared against if the file exists
+PUCK_POOL_SIZE = 64              # Pucks of each kind built up front at level start
+#* Profiling: per-phase frame times, an overlay (F3 toggles it) and a CSV/JSON export of every frame at exit
+PROFILE = bool(os.environ.get('DARING_PROFILE'))
+PROFILE_EXPORT = os.environ.get('DARING_PROFILE_EXPORT')  # .json or .csv path
+TRACE = os.environ.get('DARING_TRACE')  # Chrome trace event file (chrome://tracing, ui.perfetto.dev) written at exit
 #* Colors (RGB) vvv
 WHITE = (255, 255, 255)
 BLACK = (20, 20, 20)
@@ -66,10 +96,61 @@ BLUE = (0, 0, 255)
 GREY = (150, 150, 255)
 BROWN = (210, 100, 0)
 
-#* Pygame setup
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Puck-Wall Collision Simulation")
-clock = pygame.time.Clock()
+#* Clocks, the display itself is only opened by setup_display()
+if DETERMINISTIC:
+    # Every frame is exactly 1/FPS long and spawners read the simulated time
+    clock = SimClock(1000.0 / FPS, pace=pygame.time.Clock())
+    game_clock = clock
+    rng = random.Random(SEED)
+    tick_hashes = TickHashes(HASH_LOG)
+else:
+    clock = pygame.time.Clock()
+    game_clock = pygame.time.get_ticks
+    rng = random.Random()
+profiler = Profiler(enabled=PROFILE, budget_ms=1000.0 / FPS)
+tracer = get_tracer()
+if TRACE:
+    tracer.enable()
+
+#* Broadphase grid of puck_world slots, refiled from the world's arrays every frame.
+broadphase = SlotHash(GRID_SIZE)
+
+#* Collision layers: each listed pair is tested in one pass over the broadphase, entity1 from the first layer.
+# A new entity kind gets a layer and its pairs here instead of another pass.
+collision_layers = LayerMatrix([
+    ("puck", "puck"),
+    ("puck", "static"),
+    ("puck", "ice"),
+    ("puck", "shooter"),
+    ("shooter", "shooter"),
+    ("shooter", "ice"),
+    ("static", "shooter"),
+    ("static", "static"),
+    ("ice", "static"),
+    ("ice", "ice"),
+])
+LAYER_PUCK = collision_layers.layer("puck")
+LAYER_STATIC = collision_layers.layer("static")
+LAYER_SHOOTER = collision_layers.layer("shooter")
+LAYER_ICE = collision_layers.layer("ice")
+
+#* Every puck, static puck, shooter puck and ice cube lives in one structure-of-arrays world.
+puck_world = PuckWorld((GRID_BORDER, GRID_BORDER, WIDTH - GRID_BORDER, HEIGHT - GRID_BORDER), spatial_hash=broadphase)
+puck_world.set_kind(KIND_PUCK, damping=0.991, rest_speed=MIN_VELOCITY_THRESHOLD, rest_action=REST_DEACTIVATE)
+puck_world.set_kind(KIND_STATIC, damping=0.991, rest_speed=MIN_VELOCITY_THRESHOLD, rest_action=REST_STOP,
+                    sleep_after=SLEEP_AFTER)
+puck_world.set_kind(KIND_SHOOTER, damping=0.991)
+puck_world.set_kind(KIND_ICE, damping=0.998, rest_speed=MIN_VELOCITY_THRESHOLD, rest_action=REST_STOP,
+                    sleep_after=SLEEP_AFTER)
+#* Contact solver, circle contacts are collected during the collision checks and resolved together
+contact_solver = ContactSolver(iterations=SOLVER_ITERATIONS, restitution=0.8)
+#* Enter, stay and exit events for every pair of touching bodies, for whatever subscribes (sounds, score, triggers)
+body_contacts = ContactEvents()
+if TRACE:
+    def trace_contacts(batch):
+        if tracer.enabled:
+            tracer.counter("contacts_began", {"pairs": len(batch)})
+    body_contacts.subscribe(trace_contacts, (ENTER,))
 
 """
 Backbone functions for engine:
@@ -84,92 +165,43 @@ def entity_collision(entity1, entity2):
         entity1 (Entity): The first entity.
         entity2 (Entity): The second entity.
 
-    This function checks if the two entities' collision masks overlap.
-    If so, it applies a collision response based on whether the entities 
-    are circular or rectangular.
+    This function tests the two entities' shapes with the analytic narrowphase
+    (circle-circle, circle-AABB or AABB-AABB; only MASK shapes fall back to
+    pygame.mask overlap). If they overlap, it applies a collision response
+    based on whether the entities are circular or rectangular.
 
-    For circular entities, it calculates the collision normal and applies
-    an impulse to adjust velocities and nudge entities apart.
+    Contacts between circular entities are handed to contact_solver, which
+    resolves them all together once every pair has been checked.
 
-    For rectangular entities, it adjusts the positions and velocities 
-    to resolve the collision along the shortest axis.
+    For rectangular entities, it pushes entity1 out along the shortest axis
+    and reverses both velocities.
 
     It also checks if either entity is a Repulsion and triggers
     that entity's grow() method if so.
+
+    Returns the narrowphase contact, or None if they don't overlap.
     """
 
-    offset = (int(entity2.x - entity1.x), int(entity2.y - entity1.y))
-
-    if entity1.mask.overlap(entity2.mask, offset):
-        if hasattr(entity1, 'collision_radius') and hasattr(entity2, 'collision_radius'):
-            # Circular collision response
-            distance = math.sqrt((entity2.x - entity1.x) ** 2 + (entity2.y - entity1.y) ** 2)
-
-            if distance < 2 * entity1.collision_radius:
-                dx = entity2.x - entity1.x
-                dy = entity2.y - entity1.y
-                norm = math.sqrt(dx ** 2 + dy ** 2)
-                if norm != 0:
-                    dx /= norm
-                    dy /= norm
-
-                nudging_distance = (2 * entity1.collision_radius - distance) / 4
-                entity1.x -= dx * nudging_distance
-                entity1.y -= dy * nudging_distance
-                entity2.x += dx * nudging_distance
-                entity2.y += dy * nudging_distance
-
-            dx = entity2.x - entity1.x
-            dy = entity2.y - entity1.y
-            normal = math.sqrt(dx ** 2 + dy ** 2)
-
-            if normal != 0:  # Check for zero division
-                nx = dx / normal
-                ny = dy / normal
-                relative_vel_x = entity1.vx - entity2.vx
-                relative_vel_y = entity1.vy - entity2.vy
-                dot_product = relative_vel_x * nx + relative_vel_y * ny
-                impulse = (2 * dot_product) / (entity1.mass + entity2.mass)
-
-                slipperiness = 0.9  # You can adjust this value
-                impulse *= slipperiness
-
-                # Check if the collision is from the outside
-                if dot_product > 0:
-                    entity1.vx -= impulse * entity2.mass * nx
-                    entity1.vy -= impulse * entity2.mass * ny
-                    entity2.vx += impulse * entity1.mass * nx
-                    entity2.vy += impulse * entity1.mass * ny
+    contact = narrowphase.collide(*entity_geometry(entity1), *entity_geometry(entity2))
+
+    if contact:
+        nx, ny, depth = contact
+        if entity1.shape == narrowphase.CIRCLE and entity2.shape == narrowphase.CIRCLE:
+            # Circular collision response, solved later with every other contact of the frame
+            contact_solver.add(entity1.slot, entity2.slot, nx, ny, depth)
         else:
-            # Rectangular collision response (same as before)
-            entity1_rect = entity1.rect
-            entity2_rect = entity2.rect
-            intersection = entity1_rect.clip(entity2_rect)
-
-            if intersection.width > 0 and intersection.height > 0:
-                if intersection.width < intersection.height:
-                    # Horizontal collision
-                    if entity1_rect.left < entity2_rect.left:
-                        entity1_rect.right = entity2_rect.left
-                    else:
-                        entity1_rect.left = entity2_rect.right
-                else:
-                    # Vertical collision
-                    if entity1_rect.top < entity2_rect.top:
-                        entity1_rect.bottom = entity2_rect.top
-                    else:
-                        entity1_rect.top = entity2_rect.bottom
-
-                entity1.x = entity1_rect.centerx
-                entity1.y = entity1_rect.centery
-
-                # Apply collision response for rectangular collision
-                entity1.vx = -entity1.vx
-                entity1.vy = -entity1.vy
-                entity2.vx = -entity2.vx
-                entity2.vy = -entity2.vy
-
-                entity1.rect = entity1_rect  # Update the rect
+            # Rectangular collision response, entity1 is pushed out along the shortest axis
+            entity1.x -= nx * depth
+            entity1.y -= ny * depth
+
+            # Apply collision response for rectangular collision
+            entity1.vx = -entity1.vx
+            entity1.vy = -entity1.vy
+            entity2.vx = -entity2.vx
+            entity2.vy = -entity2.vy
+
+            if not isinstance(entity1, PuckBody):
+                entity1.rect.center = (entity1.x, entity1.y)  # Update the rect, a puck's follows its position
 
     # Check if entity1 or entity2 is a Repulsion object
     if isinstance(entity1, Bumper):
@@ -177,79 +209,128 @@ def entity_collision(entity1, entity2):
     elif isinstance(entity2, Bumper):
         entity2.grow(entity1.initial_radius, entity1.initial_mass)
 
-#* Handling all of the collision checks in a separate function for implementation in main loop.
-def cross_collisions(entity_list_1, entity_list_2):
+    return contact
+
+#* Shape and geometry of an entity for the narrowphase.
+def entity_geometry(entity):
     """
-    Check for collisions between two lists of entities.
+    Return the (shape, geometry) of an entity for narrowphase.collide().
+
+    Circles are centered on (x, y) with their collision radius, AABBs use the
+    entity bounds, and MASK shapes place the entity's mask with its top-left at (x, y).
+    """
+    if entity.shape == narrowphase.CIRCLE:
+        return entity.shape, (entity.x, entity.y, entity.collision_radius)
+    if entity.shape == narrowphase.AABB:
+        return entity.shape, entity_bounds(entity)
+    return entity.shape, (entity.mask, entity.x, entity.y)
+
+#* Bounds used to bucket an entity into the broadphase grid.
+def entity_bounds(entity):
+    """
+    Return the (left, top, right, bottom) bounds of an entity around its position.
+
+    Circular entities use their collision radius, rectangular ones their width and height.
+    Zones are anchored at their top-left corner and never move, so their rect is used.
+    """
+    if entity.shape == narrowphase.CIRCLE:
+        half_width = half_height = entity.collision_radius
+    elif isinstance(entity, Zone):
+        return entity.rect.left, entity.rect.top, entity.rect.right, entity.rect.bottom
+    else:
+        half_width = entity.width / 2
+        half_height = entity.height / 2
+    return entity.x - half_width, entity.y - half_height, entity.x + half_width, entity.y + half_height
+
+#* Files every active body in the broadphase grid at its current position, once per frame.
+def sync_broadphase(*kind_layers):
+    """
+    Refile the broadphase grid from puck_world's arrays.
 
     Args:
-        entity_list_1 (list): List of entities.
-        entity_list_2 (list): List of entities.
+        *kind_layers (tuple): (puck_world kind, collision layer) pairs; the layer is the bodies' broadphase group.
 
-    Calls entity_collision() for every active entity pair
-    between the two lists.
+    Bounds are taken from the x, y and size columns of every active body in one pass,
+    so no entity is touched. Bodies of kinds not listed and inactive bodies are left out.
+    Sleeping bodies are filed as resting, at wherever the solver or a magnet moved them.
     """
-    for entity_1 in entity_list_1:
-        if entity_1.active:
-            for entity_2 in entity_list_2:
-                if entity_2.active:
-                    entity_collision(entity_1, entity_2)
+    layer_of_kind = np.full(KIND_COUNT, -1)
+    for kind, layer in kind_layers:
+        layer_of_kind[kind] = layer
+    slots = puck_world.live_slots()
+    layers = layer_of_kind[puck_world.kind[slots]]
+    filed = layers >= 0
+    slots = slots[filed]
+    broadphase.sync(slots, *puck_world.collision_bounds(slots), layers[filed], puck_world.sleeping[slots])
+
+#* Handling all of the collision checks in one pass for implementation in main loop.
+def layer_collisions(layers):
+    """
+    Check for collisions between every pair of collision layers the matrix enables.
 
-#* Handling bumper specific collision checks.
-def bumper_collision(repulsion, pucks, static_pucks):
-    # Handle collisions between a Repulsion bumper and Pucks
-    # Checks distance between bumper and each Puck
-    # Applies impulse to Puck velocity if within collision radius
-    # Handles both moving and static Pucks
-    for puck in pucks:
-        dx = puck.x - repulsion.x
-        dy = puck.y - repulsion.y
-        distance = math.sqrt(dx ** 2 + dy ** 2)
+    Args:
+        layers (LayerMatrix): Which layers collide, and which side of each pair is entity1.
 
-        if distance < repulsion.collision_radius + puck.collision_radius:
-            # Calculate unit vector from RepulsionZone to puck
-            if distance != 0:
-                dx /= distance
-                dy /= distance
-
-            # Apply an impulse to simulate the push
-            impulse = 45  # You can adjust this value for the desired effect
-
-            # Check if the puck has zero velocity or very small velocity (adjust as needed)
-            if abs(puck.vx) < 0.1 and abs(puck.vy) < 0.1:
-                # Set a minimum velocity in the direction of the RepulsionZone
-                min_velocity = 10  # Adjust this value as needed
-                puck.vx = min_velocity * dx
-                puck.vy = min_velocity * dy
-            else:
-                # Add an impulse to the puck's velocity
-                puck.vx += impulse * dx
-                puck.vy += impulse * dy
+    Every active pair of bodies that shares a broadphase grid cell and whose layers
+    collide is tested once, and bodies are never paired with themselves.
+    sync_broadphase() must have been called earlier in the frame.
 
-    for static_puck in static_pucks:
-        dx = static_puck.x - repulsion.x
-        dy = static_puck.y - repulsion.y
-        distance = math.sqrt(dx ** 2 + dy ** 2)
+    Circle pairs, nearly all of them, are tested as array slices of puck_world in one
+    pass and handed to contact_solver together. Pairs with a box (ice cubes) go through
+    entity_collision() one at a time.
 
-        if distance < repulsion.collision_radius + static_puck.collision_radius:
-            # Calculate unit vector from RepulsionZone to static puck
-            if distance != 0:
-                dx /= distance
-                dy /= distance
-
-            # Apply an impulse to simulate the push
-            impulse = 45  # You can adjust this value for the desired effect
-
-            # Check if the static puck has zero velocity or very small velocity (adjust as needed)
-            if abs(static_puck.vx) < 0.1 and abs(static_puck.vy) < 0.1:
-                # Set a minimum velocity in the direction of the RepulsionZone
-                min_velocity = 10  # Adjust this value as needed
-                static_puck.vx = min_velocity * dx
-                static_puck.vy = min_velocity * dy
-            else:
-                # Add an impulse to the static puck's velocity
-                static_puck.vx += impulse * dx
-                static_puck.vy += impulse * dy
+    Contacts are reported to puck_world, so touching bodies sleep and wake together.
+    """
+    first, second = broadphase.pairs(layers)
+    active = puck_world.active
+    live = active[first] & active[second]
+    first = first[live]
+    second = second[live]
+
+    # Circular collision response for every circle pair, solved later with every other contact of the frame
+    width = puck_world.width
+    circles = (width[first] == 0) & (width[second] == 0)
+    a = first[circles]
+    b = second[circles]
+    x, y, collision_radius = puck_world.x, puck_world.y, puck_world.collision_radius
+    hit, nx, ny, depth = narrowphase.circles(x[a], y[a], collision_radius[a], x[b], y[b], collision_radius[b])
+    contact_solver.add_many(a[hit], b[hit], nx, ny, depth)
+    puck_world.touch_many(a[hit], b[hit])
+
+    # Boxes against anything
+    owners = puck_world.owners
+    for slot_1, slot_2 in zip(first[~circles].tolist(), second[~circles].tolist()):
+        if entity_collision(owners[slot_1], owners[slot_2]):
+            puck_world.touch(slot_1, slot_2)
+
+#* Handling bumper specific collision checks.
+def bumper_collision(repulsion):
+    # Handle collisions between a Repulsion bumper and Pucks
+    # Finds the pucks within collision radius with a world query
+    # Applies impulse to all of their velocities in one batch
+    # Handles both moving and static Pucks
+    slots = puck_world.resolve_all(puck_world.query_circle(repulsion.x, repulsion.y, repulsion.collision_radius,
+                                                           repulsion.kinds))
+    if not len(slots):
+        return
+    dx = puck_world.x[slots] - repulsion.x
+    dy = puck_world.y[slots] - repulsion.y
+    distance = np.hypot(dx, dy)
+
+    # Calculate unit vectors from RepulsionZone to each puck
+    centered = distance == 0
+    dx = np.where(centered, dx, dx / np.where(centered, 1.0, distance))
+    dy = np.where(centered, dy, dy / np.where(centered, 1.0, distance))
+
+    # Apply an impulse to simulate the push
+    impulse = 45  # You can adjust this value for the desired effect
+    # Pucks with zero velocity or very small velocity (adjust as needed) get a minimum velocity instead
+    min_velocity = 10  # Adjust this value as needed
+    vx = puck_world.vx[slots]
+    vy = puck_world.vy[slots]
+    still = (np.abs(vx) < 0.1) & (np.abs(vy) < 0.1)
+    puck_world.vx[slots] = np.where(still, min_velocity * dx, vx + impulse * dx)
+    puck_world.vy[slots] = np.where(still, min_velocity * dy, vy + impulse * dy)
 
 # TODO: Phase out pygame rendering for on board .py script!
 
@@ -265,7 +346,7 @@ def directional_ray(screen, entity, ray_color):
     end_x = entity.x + ray_length * math.cos(direction_angle)
     end_y = entity.y + ray_length * math.sin(direction_angle)
     # Draw the ray on the screen
-    pygame.draw.line(screen, ray_color, (entity.x, entity.y), (end_x, end_y), 2)
+    return pygame.draw.line(screen, ray_color, (entity.x, entity.y), (end_x, end_y), 2)
 
 #* Debugging widget for shooter specific directional tracking. 
 def shooter_directional_ray(screen, entity, ray_color):
@@ -277,11 +358,11 @@ def shooter_directional_ray(screen, entity, ray_color):
     end_x = entity.x + ray_length * math.cos(direction_angle)
     end_y = entity.y + ray_length * math.sin(direction_angle)
     # Draw the ray on the screen
-    pygame.draw.line(screen, ray_color, (entity.x, entity.y), (end_x, end_y), 2)
+    return pygame.draw.line(screen, ray_color, (entity.x, entity.y), (end_x, end_y), 2)
 
 #* Callable basic math function for random negative angles
 def rand_angle():
-    rand_angle = random.randint(0,-360)
+    rand_angle = rng.randint(-360, 0)
     return rand_angle
 
 """
@@ -290,7 +371,16 @@ vvvvvvvvvvvvv
 """
 class Entity:
     # Entity class represents a basic object in the game world with position, velocity, mass, collision detection etc.
+    # Entities are slotted to keep them small, the concrete classes declare the slots they store themselves.
+    __slots__ = ()
+    shape = narrowphase.CIRCLE
+
     def __init__(self, x, y, vx, vy, mass, drawn_radius, collision_radius):
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.spawn(x, y, vx, vy, mass, drawn_radius, collision_radius)
+
+    # Sets up a new or recycled entity without allocating, the mask is shared per radius.
+    def spawn(self, x, y, vx, vy, mass, drawn_radius, collision_radius):
         self.x = x
         self.y = y
         self.vx = vx
@@ -300,20 +390,20 @@ class Entity:
         self.collision_radius = collision_radius
         self.active = True
 
-        self.rect = pygame.Rect(x - collision_radius, y - collision_radius, collision_radius * 2, collision_radius * 2)
-        
-        mask_surface = pygame.Surface((collision_radius * 2, collision_radius * 2), pygame.SRCALPHA)
-        pygame.draw.circle(mask_surface, BLACK, (collision_radius, collision_radius), collision_radius)
-        self.mask = pygame.mask.from_surface(mask_surface)
+        self.rect.update(x - collision_radius, y - collision_radius, collision_radius * 2, collision_radius * 2)
+        # Masks are shared by every entity of the same shape and size (mask_cache), never modify them
+        self.mask = circle_mask(collision_radius)
 
     def entity_collision(self, other_entity):
-        offset = (int(other_entity.x - self.x), int(other_entity.y - self.y))
-        return self.mask.overlap(other_entity.mask, offset)
+        return narrowphase.collide(*entity_geometry(self), *entity_geometry(other_entity))
 
 # TODO: Figure out how to implement this class.
 class UniqueEntity:
     # UniqueEntity class represents a unique entity in the game world
     # with custom dimensions, position, velocity and collision detection.
+    __slots__ = ()
+    shape = narrowphase.AABB
+
     def __init__(self, x, y, vx, vy, mass, width, height, drawn_color):
         self.x = x
         self.y = y
@@ -327,17 +417,19 @@ class UniqueEntity:
 
         self.rect = pygame.Rect(x - (width / 2), y - (height / 2), width, height)
 
-        mask_surface = pygame.Surface((width, height), pygame.SRCALPHA)
-        pygame.draw.rect(mask_surface, (0, 0, 0, 0), (0, 0, width, height))  # Rectangular mask
-        self.mask = pygame.mask.from_surface(mask_surface)
+        self.mask = rect_mask(width, height)  # Rectangular mask
 
     def entity_collision(self, other_entity):
-        offset = (int(other_entity.x - self.x), int(other_entity.y - self.y))
-        return self.mask.overlap(other_entity.mask, offset)
+        return narrowphase.collide(*entity_geometry(self), *entity_geometry(other_entity))
 
 # TODO: Fix to accept speed and negative angle and convert it to directional velocity using backbone angle functions.
 class SpawnerBox:
-    def __init__(self, x, y, width, height, drawn_color, collision_color, spawn_cooldown=1000, initial_spawn_delay=0):
+    __slots__ = ('x', 'y', 'rect', 'drawn_color', 'collision_color', 'velocity_x', 'velocity_y', 'mass', 'angle',
+                 'spawn_cooldown', 'initial_spawn_delay', 'last_spawn_time', 'has_spawned_initial_puck', 'clock')
+
+    # clock: callable returning milliseconds, defaults to game_clock (simulated in DETERMINISTIC mode)
+    def __init__(self, x, y, width, height, drawn_color, collision_color, spawn_cooldown=1000, initial_spawn_delay=0,
+                 clock=None):
         self.x = float(x)  # Store x and y as floats
         self.y = float(y)
         self.rect = pygame.Rect(x, y, width, height)
@@ -349,7 +441,8 @@ class SpawnerBox:
         self.angle = 0
         self.spawn_cooldown = spawn_cooldown  # Cooldown time between puck spawns in milliseconds
         self.initial_spawn_delay = initial_spawn_delay  # Delay before the first spawn in milliseconds
-        self.last_spawn_time = pygame.time.get_ticks()
+        self.clock = clock if clock else game_clock
+        self.last_spawn_time = self.clock()
         self.has_spawned_initial_puck = False
 
     def set_parameters(self, velocity_x, velocity_y, mass, angle):
@@ -359,14 +452,14 @@ class SpawnerBox:
         self.angle = angle
 
     def spawn_puck(self, pucks, dt):
-        current_time = pygame.time.get_ticks()
+        current_time = self.clock()
 
         if not self.has_spawned_initial_puck and current_time >= self.initial_spawn_delay:
             # Initial puck spawn after the initial delay
             angle_rad = math.radians(self.angle)
             vx = self.velocity_x * math.cos(angle_rad)
             vy = self.velocity_y * math.sin(angle_rad)
-            pucks.append(Puck(self.x, self.y, vx, vy, self.mass, PUCK_RADIUS, COLLISION_RADIUS))
+            commands.create(pucks, self.x, self.y, vx, vy, self.mass, PUCK_RADIUS, COLLISION_RADIUS)
             self.last_spawn_time = current_time
             self.has_spawned_initial_puck = True
         elif current_time - self.last_spawn_time >= self.spawn_cooldown:
@@ -374,18 +467,18 @@ class SpawnerBox:
             angle_rad = math.radians(self.angle)
             vx = self.velocity_x * math.cos(angle_rad)
             vy = self.velocity_y * math.sin(angle_rad)
-            pucks.append(Puck(self.x, self.y, vx, vy, self.mass, PUCK_RADIUS, COLLISION_RADIUS))
+            commands.create(pucks, self.x, self.y, vx, vy, self.mass, PUCK_RADIUS, COLLISION_RADIUS)
             self.last_spawn_time = current_time
 
     def spawn_shooter_puck(self, shooter_pucks, dt):
-        current_time = pygame.time.get_ticks()
+        current_time = self.clock()
 
         if not self.has_spawned_initial_puck and current_time >= self.initial_spawn_delay:
             # Initial shooter puck spawn after the initial delay
             angle_rad = math.radians(self.angle)
             vx = self.velocity_x * math.cos(angle_rad)
             vy = self.velocity_y * math.sin(angle_rad)
-            shooter_pucks.append(ShooterPuck(self.x, self.y, vx, vy, self.mass, PUCK_RADIUS, COLLISION_RADIUS))
+            commands.create(shooter_pucks, self.x, self.y, vx, vy, self.mass, PUCK_RADIUS, COLLISION_RADIUS)
             self.last_spawn_time = current_time
             self.has_spawned_initial_puck = True
         elif current_time - self.last_spawn_time >= self.spawn_cooldown:
@@ -393,18 +486,18 @@ class SpawnerBox:
             angle_rad = math.radians(self.angle)
             vx = self.velocity_x * math.cos(angle_rad)
             vy = self.velocity_y * math.sin(angle_rad)
-            shooter_pucks.append(ShooterPuck(self.x, self.y, vx, vy, self.mass, PUCK_RADIUS, COLLISION_RADIUS))
+            commands.create(shooter_pucks, self.x, self.y, vx, vy, self.mass, PUCK_RADIUS, COLLISION_RADIUS)
             self.last_spawn_time = current_time
 
     def spawn_static_puck(self, static_pucks, dt):
-        current_time = pygame.time.get_ticks()
+        current_time = self.clock()
 
         if not self.has_spawned_initial_puck and current_time >= self.initial_spawn_delay:
             # Initial static puck spawn after the initial delay
             angle_rad = math.radians(self.angle)
             vx = self.velocity_x * math.cos(angle_rad)
             vy = self.velocity_y * math.sin(angle_rad)
-            static_pucks.append(StaticPuck(self.x, self.y, vx, vy, self.mass, PUCK_RADIUS, COLLISION_RADIUS))
+            commands.create(static_pucks, self.x, self.y, vx, vy, self.mass, PUCK_RADIUS, COLLISION_RADIUS)
             self.last_spawn_time = current_time
             self.has_spawned_initial_puck = True
         elif current_time - self.last_spawn_time >= self.spawn_cooldown:
@@ -412,7 +505,7 @@ class SpawnerBox:
             angle_rad = math.radians(self.angle)
             vx = self.velocity_x * math.cos(angle_rad)
             vy = self.velocity_y * math.sin(angle_rad)
-            static_pucks.append(StaticPuck(self.x, self.y, vx, vy, self.mass, PUCK_RADIUS, COLLISION_RADIUS))
+            commands.create(static_pucks, self.x, self.y, vx, vy, self.mass, PUCK_RADIUS, COLLISION_RADIUS)
             self.last_spawn_time = current_time
 
     # TODO: Add support for spawning ice_cubes, static_pucks, or pucks based on parameter input when it is instantiated.
@@ -427,6 +520,12 @@ class SpawnerBox:
 # TODO: Add static velocity in respective direction to stationary pucks based location away from repulsion center.
 # TODO: Fix Reset delay to be called!!!
 class Bumper:
+    __slots__ = ('x', 'y', 'radius', 'mass', 'growth_rate', 'circle_color', 'triggered', 'triggered_time',
+                 'initial_radius', 'initial_mass', 'growing', 'target_radius', 'reset_delay', 'reset_counter',
+                 'collision_radius', 'mask', 'active')
+    shape = narrowphase.CIRCLE
+    kinds = (KIND_PUCK, KIND_STATIC)  # Bodies a bumper triggers on and pushes
+
     def __init__(self, x, y, initial_radius, initial_mass, growth_rate, circle_color, target_radius=None):
         # Initialize RepulsionZone properties
         self.x = x
@@ -444,8 +543,7 @@ class Bumper:
         self.reset_delay = 240
         self.reset_counter = 0
         self.collision_radius = initial_radius  # Set the collision_radius to initial_radius
-        self.mask = pygame.mask.from_surface(pygame.Surface((self.radius * 2, self.radius * 2), pygame.SRCALPHA))
-        self.mask.fill()
+        self.mask = rect_mask(self.radius * 2, self.radius * 2)
 
         # Set initial values
         self.active = True
@@ -496,43 +594,64 @@ class Bumper:
         self.triggered_time = 0
         self.radius = self.initial_radius  # Reset the radius to the initial value
         self.growing = False  # Reset growing to False when resetting
-        self.mask = pygame.mask.from_surface(pygame.Surface((self.radius * 2, self.radius * 2), pygame.SRCALPHA))
-        self.mask.fill()
-
-    def collide(self, pucks, static_pucks):
-        # Check for collisions with pucks
-        for puck in pucks:
-            distance = math.sqrt((puck.x - self.x) ** 2 + (puck.y - self.y) ** 2)
-
-            # Check if the puck is within the collision radius
-            if distance < self.collision_radius + puck.collision_radius:
-                # Trigger the RepulsionZone on collision
-                self.trigger()
-
-        # Check for collisions with static pucks
-        for static_puck in static_pucks:
-            distance = math.sqrt((static_puck.x - self.x) ** 2 + (static_puck.y - self.y) ** 2)
+        self.mask = rect_mask(self.radius * 2, self.radius * 2)
 
-            # Check if the static puck is within the collision radius
-            if distance < self.collision_radius + static_puck.collision_radius:
-                # Trigger the RepulsionZone on collision
-                self.trigger()
+    def collide(self):
+        # Trigger the RepulsionZone if any puck or static puck is within the collision radius
+        touching = len(puck_world.query_circle(self.x, self.y, self.collision_radius, self.kinds)) > 0
+        if touching:
+            self.trigger()
+        return touching
 
 """
 Entity and UniqueEntity Classes:
 vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
 """
-class Puck(Entity):
-    def __init__(self, x, y, vx, vy, mass, drawn_radius, collision_radius):
-        super().__init__(x, y, vx, vy, mass, drawn_radius, collision_radius)
+# Pucks and ice cubes are views into puck_world; their x, y, vx, vy, mass, radius, collision_radius and active live in its arrays.
+# Pucks are recycled through the puck pools: acquire() spawns one, release() despawns it.
+# A puck stores nothing but its slot; its rect and mask are worked out from the columns when asked for.
+class PuckBody(PuckView, Entity):
+    __slots__ = ()
 
-class StaticPuck(Entity):
     def __init__(self, x, y, vx, vy, mass, drawn_radius, collision_radius):
-        super().__init__(x, y, vx, vy, mass, drawn_radius, collision_radius)
+        self.spawn(x, y, vx, vy, mass, drawn_radius, collision_radius)
 
-class ShooterPuck(Entity):
-    def __init__(self, x, y, vx, vy, mass, drawn_radius, collision_radius):
-        super().__init__(x, y, vx, vy, mass, drawn_radius, collision_radius)
+    def spawn(self, x, y, vx, vy, mass, drawn_radius, collision_radius):
+        # A new slot starts zeroed and active
+        self.attach(puck_world)
+        self.x = x
+        self.y = y
+        self.vx = vx
+        self.vy = vy
+        self.mass = mass
+        self.radius = drawn_radius
+        self.collision_radius = collision_radius
+
+    def despawn(self):
+        self.detach()
+
+    # Only read by the mask and AABB fallbacks of entity_collision(), never on the circle path
+    @property
+    def rect(self):
+        collision_radius = self.collision_radius
+        return pygame.Rect(self.x - collision_radius, self.y - collision_radius, collision_radius * 2,
+                           collision_radius * 2)
+
+    @property
+    def mask(self):
+        return circle_mask(self.collision_radius)
+
+class Puck(PuckBody):
+    __slots__ = ()
+    kind = KIND_PUCK
+
+class StaticPuck(PuckBody):
+    __slots__ = ()
+    kind = KIND_STATIC
+
+class ShooterPuck(PuckBody):
+    __slots__ = ()
+    kind = KIND_SHOOTER
 
 # TODO: Add Skull(Entity) class. ***
 # TODO: This class should have movement and collision detection, as well as turning pucks inactive 1 second after collision. (puck will flash rapidly)
@@ -541,13 +660,21 @@ class ShooterPuck(Entity):
 # TODO: This class should have movement and collision detection, as well as turning pucks inactive on collision and leaving a path of friction2 ice in its wake.
 
 # TODO: Fix this entity !!!
-class IceCube(UniqueEntity):
+class IceCube(PuckView, UniqueEntity):
+    __slots__ = ('drawn_color', 'rect', 'mask')
+    kind = KIND_ICE
+
     def __init__(self, x, y , vx, vy, mass, width, height, drawn_color):
-        super().__init__(x, y, vx, vy, mass, width, height, drawn_color)
+        self.attach(puck_world)
+        UniqueEntity.__init__(self, x, y, vx, vy, mass, width, height, drawn_color)
 
 # TODO: Make multiple shape options for Zone dimensional parameters, ie. circular and triangular as well as the rectangle that already exists.
 # TODO: Each of these options should be named and referenced respectively, ie. circle, rectangle, and triangle.
 class Zone(Entity):
+    __slots__ = ('x', 'y', 'vx', 'vy', 'mass', 'radius', 'collision_radius', 'active', 'rect', 'mask',
+                 'width', 'height', 'drawn_color', 'collision_color')
+    shape = narrowphase.AABB
+
     def __init__(self, x, y, width, height, drawn_color, collision_color):
         super().__init__(x, y, 0, 0, 0, 0, 0)
         self.width = width
@@ -557,308 +684,156 @@ class Zone(Entity):
 
         self.rect = pygame.Rect(x, y, width, height)
 
-        drawn_surface = pygame.Surface((width, height), pygame.SRCALPHA)
-        pygame.draw.rect(drawn_surface, drawn_color, (0, 0, width, height))
-        self.drawn_mask = pygame.mask.from_surface(drawn_surface)
+        # Drawn and collision areas are the same rectangle, so they share one mask
+        self.mask = rect_mask(width, height)
 
-        collision_surface = pygame.Surface((width, height), pygame.SRCALPHA)
-        pygame.draw.rect(collision_surface, collision_color, (0, 0, width, height))
-        self.collision_mask = pygame.mask.from_surface(collision_surface)
+    @property
+    def drawn_mask(self):
+        return self.mask
 
-"""
-Zone Classes:
-vvvvvvvvvvvvv
-"""
-# For triggering instantiation or activation of an entity that previously was inactive or non-existent.
-class Activation(Zone):
-    def __init__(self, x, y, width, height, event, delay):
-        super().__init__(x, y, width, height, BLACK, WHITE)
-        self.event = event
-        self.delay = delay
+    @property
+    def collision_mask(self):
+        return self.mask
 
-    def check_collision(self, puck):
-        puck_left = puck.x - puck.radius
-        puck_right = puck.x + puck.radius
-        puck_top = puck.y - puck.radius
-        puck_bottom = puck.y + puck.radius
-
-        box_left = self.rect.left
-        box_right = self.rect.right
-        box_top = self.rect.top
-        box_bottom = self.rect.bottom
+    # Settings read by the batched zone pass (ZoneEffects), overridden by each zone class.
+    effect = None           # One of the zone_effects EFFECT_* names, None for no batched effect
+    overlap_threshold = 1.0  # Fraction of the puck's area that has to be inside the zone
+    kinds = ()              # puck_world kinds the zone affects
 
-        puck_overlap_x = max(0, min(puck_right, box_right) - max(puck_left, box_left))
-        puck_overlap_y = max(0, min(puck_bottom, box_bottom) - max(puck_top, box_top))
+    def overlap_ratio(self, puck):
+        # Area of the puck's bounding square inside the zone, relative to the puck's circle area.
+        puck_overlap_x = max(0, min(puck.x + puck.radius, self.rect.right) - max(puck.x - puck.radius, self.rect.left))
+        puck_overlap_y = max(0, min(puck.y + puck.radius, self.rect.bottom) - max(puck.y - puck.radius, self.rect.top))
 
         puck_overlap_area = puck_overlap_x * puck_overlap_y
         puck_area = math.pi * (puck.radius ** 2)
 
-        if puck_overlap_area >= 0.25 * puck_area:
-            # Trigger the event after the delay has passed in milliseconds
-            if self.delay <= 0:
-                self.event()
-            else:
-                self.delay -= 1
-
-# For triggering a specific function or set of functions, in a standard order, on an entity that already is active or exists.
-class Trigger(Zone):
-    def __init__(self, x, y, width, height, event, delay):
-        super().__init__(x, y, width, height, BLACK, WHITE)
-        self.event = event
-        self.delay = delay
-
-    def check_collision(self, puck):
-        puck_left = puck.x - puck.radius
-        puck_right = puck.x + puck.radius
-        puck_top = puck.y - puck.radius
-        puck_bottom = puck.y + puck.radius
-
-        box_left = self.rect.left
-        box_right = self.rect.right
-        box_top = self.rect.top
-        box_bottom = self.rect.bottom
-
-        puck_overlap_x = max(0, min(puck_right, box_right) - max(puck_left, box_left))
-        puck_overlap_y = max(0, min(puck_bottom, box_bottom) - max(puck_top, box_top))
-
-        puck_overlap_area = puck_overlap_x * puck_overlap_y
-        puck_area = math.pi * (puck.radius ** 2)
+        return puck_overlap_area / puck_area
 
-        if puck_overlap_area >= 0.25 * puck_area:
-            # Trigger the event after the delay has passed in milliseconds
-            if self.delay <= 0:
-                self.event()
-            else:
-                self.delay -= 1
+"""
+Zone Classes:
+vvvvvvvvvvvvv
+"""
+# Shared by the zones that call an event once a puck has been inside them for a number of frames.
+class EventZone(Zone):
+    __slots__ = ('event', 'delay')
+    effect = EFFECT_CONTACT
+    overlap_threshold = 0.25
+    kinds = (KIND_PUCK,)
 
-# For triggering a SpawnerBox with custom params.
-class SpawnTrigger(Zone):
     def __init__(self, x, y, width, height, event, delay):
         super().__init__(x, y, width, height, BLACK, WHITE)
         self.event = event
         self.delay = delay
 
-    def check_collision(self, puck):
-        puck_left = puck.x - puck.radius
-        puck_right = puck.x + puck.radius
-        puck_top = puck.y - puck.radius
-        puck_bottom = puck.y + puck.radius
-
-        box_left = self.rect.left
-        box_right = self.rect.right
-        box_top = self.rect.top
-        box_bottom = self.rect.bottom
+    def on_contact(self, batch):
+        # Trigger the event once for each puck that has stayed inside for the delay (in frames)
+        if batch.event != EXIT:
+            for _ in range(np.count_nonzero(batch.ticks == max(self.delay, 0))):
+                self.event()
 
-        puck_overlap_x = max(0, min(puck_right, box_right) - max(puck_left, box_left))
-        puck_overlap_y = max(0, min(puck_bottom, box_bottom) - max(puck_top, box_top))
+# For triggering instantiation or activation of an entity that previously was inactive or non-existent.
+class Activation(EventZone):
+    __slots__ = ()
 
-        puck_overlap_area = puck_overlap_x * puck_overlap_y
-        puck_area = math.pi * (puck.radius ** 2)
+# For triggering a specific function or set of functions, in a standard order, on an entity that already is active or exists.
+class Trigger(EventZone):
+    __slots__ = ()
 
-        if puck_overlap_area >= 0.25 * puck_area:
-            # Trigger the event after the delay has passed in milliseconds
-            if self.delay <= 0:
-                self.event()
-            else:
-                self.delay -= 1
+# For triggering a SpawnerBox with custom params.
+class SpawnTrigger(EventZone):
+    __slots__ = ()
 
 # TODO: Update for ice_cubes, and shooter_pucks.
 class KillBox(Zone):
+    __slots__ = ()
+    effect = EFFECT_KILL
+    overlap_threshold = 0.70
+    kinds = (KIND_PUCK, KIND_STATIC)
+
     def __init__(self, x, y, width, height):
         super().__init__(x, y, width, height, BLACK, WHITE)
 
     def check_collision(self, puck):
-        puck_left = puck.x - puck.radius
-        puck_right = puck.x + puck.radius
-        puck_top = puck.y - puck.radius
-        puck_bottom = puck.y + puck.radius
-
-        box_left = self.rect.left
-        box_right = self.rect.right
-        box_top = self.rect.top
-        box_bottom = self.rect.bottom
-
-        puck_overlap_x = max(0, min(puck_right, box_right) - max(puck_left, box_left))
-        puck_overlap_y = max(0, min(puck_bottom, box_bottom) - max(puck_top, box_top))
-
-        puck_overlap_area = puck_overlap_x * puck_overlap_y
-        puck_area = math.pi * (puck.radius ** 2)
-
-        if puck_overlap_area >= 0.70 * puck_area:
+        if self.overlap_ratio(puck) >= self.overlap_threshold:
             puck.active = False
 
     def check_static_collision(self, static_puck):
-        static_puck_left = static_puck.x - static_puck.radius
-        static_puck_right = static_puck.x + static_puck.radius
-        static_puck_top = static_puck.y - static_puck.radius
-        static_puck_bottom = static_puck.y + static_puck.radius
-
-        box_left = self.rect.left
-        box_right = self.rect.right
-        box_top = self.rect.top
-        box_bottom = self.rect.bottom
-
-        static_puck_overlap_x = max(0, min(static_puck_right, box_right) - max(static_puck_left, box_left))
-        static_puck_overlap_y = max(0, min(static_puck_bottom, box_bottom) - max(static_puck_top, box_top))
-
-        static_puck_overlap_area = static_puck_overlap_x * static_puck_overlap_y
-        static_puck_area = math.pi * (static_puck.radius ** 2)
-
-        if static_puck_overlap_area >= 0.70 * static_puck_area:
-            static_puck.active = False
+        self.check_collision(static_puck)
 
         # TODO: Check for Ice Cube collision
 
 class FrictionZone(Zone):
+    __slots__ = ('friction',)
+    effect = EFFECT_FRICTION
+    overlap_threshold = 0.33
+    kinds = (KIND_PUCK, KIND_STATIC)
+
     def __init__(self, x, y, width, height, friction):
         super().__init__(x, y, width, height, RED, GREEN)
         self.friction = friction
 
     def apply_friction(self, puck):
-        puck_left = puck.x - puck.radius
-        puck_right = puck.x + puck.radius
-        puck_top = puck.y - puck.radius
-        puck_bottom = puck.y + puck.radius
-
-        box_left = self.rect.left
-        box_right = self.rect.right
-        box_top = self.rect.top
-        box_bottom = self.rect.bottom
-
-        puck_overlap_x = max(0, min(puck_right, box_right) - max(puck_left, box_left))
-        puck_overlap_y = max(0, min(puck_bottom, box_bottom) - max(puck_top, box_top))
-
-        puck_overlap_area = puck_overlap_x * puck_overlap_y
-        puck_area = math.pi * (puck.radius ** 2)
-
-        if puck_overlap_area >= 0.33 * puck_area:
+        if self.overlap_ratio(puck) >= self.overlap_threshold:
             # Apply friction to the puck's velocities
             puck.vx *= self.friction
             puck.vy *= self.friction
 
     def apply_static_friction(self, static_puck):
-        static_puck_left = static_puck.x - static_puck.radius
-        static_puck_right = static_puck.x + static_puck.radius
-        static_puck_top = static_puck.y - static_puck.radius
-        static_puck_bottom = static_puck.y + static_puck.radius
-
-        box_left = self.rect.left
-        box_right = self.rect.right
-        box_top = self.rect.top
-        box_bottom = self.rect.bottom
-
-        static_puck_overlap_x = max(0, min(static_puck_right, box_right) - max(static_puck_left, box_left))
-        static_puck_overlap_y = max(0, min(static_puck_bottom, box_bottom) - max(static_puck_top, box_top))
-
-        static_puck_overlap_area = static_puck_overlap_x * static_puck_overlap_y
-        static_puck_area = math.pi * (static_puck.radius ** 2)
-
-        if static_puck_overlap_area >= 0.33 * static_puck_area:
-            # Apply friction to the puck's velocities
-            static_puck.vx *= self.friction
-            static_puck.vy *= self.friction
+        self.apply_friction(static_puck)
 
 class DirBooster(Zone):
+    __slots__ = ('boost_velocity', 'pucks_passed', 'static_pucks_passed', 'angle', 'boost_delay_frames')
+    effect = EFFECT_CONTACT
+    overlap_threshold = 0.85
+    kinds = (KIND_PUCK, KIND_STATIC)
+
     def __init__(self, x, y, width, height, angle, boost_velocity):
         super().__init__(x, y, width, height, YELLOW, BLUE)
         self.boost_velocity = boost_velocity
-        self.pucks_passed = set()
-        self.static_pucks_passed = set()
+        # Bodies boosted so far, by slot; they drop out on their own when despawned
+        self.pucks_passed = SlotSet(puck_world)
+        self.static_pucks_passed = SlotSet(puck_world)
         self.angle = angle
-        self.boost_delay_frames = 4  # Delay the boost by 4 frames (120fps)
-        self.frame_count = 0
-
-    def apply_boost(self, puck):
-        puck_left = puck.x - puck.radius
-        puck_right = puck.x + puck.radius
-        puck_top = puck.y - puck.radius
-        puck_bottom = puck.y + puck.radius
-
-        box_left = self.rect.left
-        box_right = self.rect.right
-        box_top = self.rect.top
-        box_bottom = self.rect.bottom
-
-        puck_overlap_x = max(0, min(puck_right, box_right) - max(puck_left, box_left))
-        puck_overlap_y = max(0, min(puck_bottom, box_bottom) - max(puck_top, box_top))
-
-        puck_overlap_area = puck_overlap_x * puck_overlap_y
-        puck_area = math.pi * (puck.radius ** 2)
-
-        if puck_overlap_area >= 0.85 * puck_area:
-            if puck not in self.pucks_passed:
-                # Reset the player velocity
-                puck.vx = 1.0
-                puck.vy = 1.0
-                
-                angle_rad = math.radians(self.angle)
-                
-                # Delay the boost by the specified frames
-                if self.frame_count >= self.boost_delay_frames:
-                    # Apply the boost in the direction of the current velocity
-                    puck.vx = self.boost_velocity * math.cos(angle_rad)
-                    puck.vy = self.boost_velocity * math.sin(angle_rad)
-
-                    # Mark the puck as boosted
-                    self.pucks_passed.add(puck)
-
-                # Increment the frame count
-                self.frame_count += 1
-            
-    def apply_static_boost(self, static_puck):
-        static_puck_left = static_puck.x - static_puck.radius
-        static_puck_right = static_puck.x + static_puck.radius
-        static_puck_top = static_puck.y - static_puck.radius
-        static_puck_bottom = static_puck.y + static_puck.radius
-
-        box_left = self.rect.left
-        box_right = self.rect.right
-        box_top = self.rect.top
-        box_bottom = self.rect.bottom
-
-        static_puck_overlap_x = max(0, min(static_puck_right, box_right) - max(static_puck_left, box_left))
-        static_puck_overlap_y = max(0, min(static_puck_bottom, box_bottom) - max(static_puck_top, box_top))
-
-        static_puck_overlap_area = static_puck_overlap_x * static_puck_overlap_y
-        static_puck_area = math.pi * (static_puck.radius ** 2)
-
-        if static_puck_overlap_area >= 0.85 * static_puck_area:
-            angle_rad = math.radians(self.angle)
-            
-            # Delay the boost by the specified frames
-            if self.frame_count >= self.boost_delay_frames:
-                # Apply the boost in the direction of the current velocity
-                static_puck.vx = self.boost_velocity * math.cos(angle_rad)
-                static_puck.vy = self.boost_velocity * math.sin(angle_rad)
-
-            # Increment the frame count
-            self.frame_count += 1
+        self.boost_delay_frames = 4  # Delay the boost by 4 frames (120fps), counted from when each puck enters
+
+    def on_contact(self, batch):
+        if batch.event == EXIT:
+            return
+        slots = batch.first_slots
+        ticks = batch.ticks
+        static = puck_world.kind[slots] == KIND_STATIC
+
+        # Pucks not boosted yet are held still until the delay is up, then boosted once
+        waiting = ~static & ~np.isin(slots, self.pucks_passed.slots())
+        held = slots[waiting & (ticks < self.boost_delay_frames)]
+        puck_world.vx[held] = 1.0
+        puck_world.vy[held] = 1.0
+
+        # Static pucks aren't held, they are boosted once each time they have been inside for the delay
+        boosted = (waiting & (ticks >= self.boost_delay_frames)) | (static & (ticks == self.boost_delay_frames))
+        angle_rad = math.radians(self.angle)
+        puck_world.vx[slots[boosted]] = self.boost_velocity * math.cos(angle_rad)
+        puck_world.vy[slots[boosted]] = self.boost_velocity * math.sin(angle_rad)
+
+        # Mark the pucks as boosted
+        self.pucks_passed.add(slots[boosted & ~static])
 
 class Booster(Zone):
+    __slots__ = ('boost_velocity', 'pucks_passed', 'static_pucks_passed')
+    effect = EFFECT_BOOST
+    overlap_threshold = 0.71
+    kinds = (KIND_PUCK, KIND_STATIC)
+
     def __init__(self, x, y, width, height, boost_velocity):
         super().__init__(x, y, width, height, YELLOW, BLUE)
         self.boost_velocity = boost_velocity
-        self.pucks_passed = set()
-        self.static_pucks_passed = set()
+        # Bodies boosted so far, by slot; they drop out on their own when despawned
+        self.pucks_passed = SlotSet(puck_world)
+        self.static_pucks_passed = SlotSet(puck_world)
 
     def apply_boost(self, puck):
-        puck_left = puck.x - puck.radius
-        puck_right = puck.x + puck.radius
-        puck_top = puck.y - puck.radius
-        puck_bottom = puck.y + puck.radius
-
-        box_left = self.rect.left
-        box_right = self.rect.right
-        box_top = self.rect.top
-        box_bottom = self.rect.bottom
-
-        puck_overlap_x = max(0, min(puck_right, box_right) - max(puck_left, box_left))
-        puck_overlap_y = max(0, min(puck_bottom, box_bottom) - max(puck_top, box_top))
-
-        puck_overlap_area = puck_overlap_x * puck_overlap_y
-        puck_area = math.pi * (puck.radius ** 2)
-
-        if puck_overlap_area >= 0.71 * puck_area:
+        if self.overlap_ratio(puck) >= self.overlap_threshold:
             # Calculate the direction vector of the puck's current velocity
             velocity_magnitude = math.sqrt(puck.vx ** 2 + puck.vy ** 2)
             if velocity_magnitude != 0:
@@ -870,111 +845,89 @@ class Booster(Zone):
                 puck.vy += self.boost_velocity * dy
 
                 # Mark the puck as boosted
-                self.pucks_passed.add(puck)
-            
-    def apply_static_boost(self, static_puck):
-        static_puck_left = static_puck.x - static_puck.radius
-        static_puck_right = static_puck.x + static_puck.radius
-        static_puck_top = static_puck.y - static_puck.radius
-        static_puck_bottom = static_puck.y + static_puck.radius
-
-        box_left = self.rect.left
-        box_right = self.rect.right
-        box_top = self.rect.top
-        box_bottom = self.rect.bottom
-
-        static_puck_overlap_x = max(0, min(static_puck_right, box_right) - max(static_puck_left, box_left))
-        static_puck_overlap_y = max(0, min(static_puck_bottom, box_bottom) - max(static_puck_top, box_top))
-
-        static_puck_overlap_area = static_puck_overlap_x * static_puck_overlap_y
-        static_puck_area = math.pi * (static_puck.radius ** 2)
+                self.mark_boosted(puck.slot)
 
-        if static_puck_overlap_area >= 0.71 * static_puck_area:
-            # Calculate the direction vector of the puck's current velocity
-            velocity_magnitude = math.sqrt(static_puck.vx ** 2 + static_puck.vy ** 2)
-            if velocity_magnitude != 0:
-                dx = static_puck.vx / velocity_magnitude
-                dy = static_puck.vy / velocity_magnitude
-
-                # Apply the boost in the direction of the current velocity
-                static_puck.vx += self.boost_velocity * dx
-                static_puck.vy += self.boost_velocity * dy
+    def apply_static_boost(self, static_puck):
+        self.apply_boost(static_puck)
 
-                # Mark the puck as boosted
-                self.static_pucks_passed.add(static_puck)
+    def mark_boosted(self, slots):
+        slots = np.atleast_1d(slots)
+        static = puck_world.kind[slots] == KIND_STATIC
+        self.static_pucks_passed.add(slots[static])
+        self.pucks_passed.add(slots[~static])
 
 class Magnet(Zone):
+    __slots__ = ('pull_speed', 'velocity_cap', 'magnetized_pucks')
+    kinds = (KIND_PUCK, KIND_STATIC)
+
     def __init__(self, x, y, radius, pull_speed, velocity_cap):
         super().__init__(x, y, radius * 2, radius * 2, BLUE, YELLOW)
         self.radius = radius
         self.pull_speed = pull_speed
         self.velocity_cap = velocity_cap  # Maximum velocity allowed inside the magnet zone
-        self.magnetized_pucks = set()  # Keep track of magnetized pucks
-
-    def apply_magnetism(self, puck):
-        # Calculate the distance between the puck and the center of the magnet
-        dx = self.rect.centerx - puck.x
-        dy = self.rect.centery - puck.y
-        distance = math.sqrt(dx ** 2 + dy ** 2)
-
-        # Check if the puck is inside the magnet's circular area
-        if puck not in self.magnetized_pucks and distance <= self.radius + puck.radius:
-            self.magnetized_pucks.add(puck)  # Mark the puck as magnetized
-
-        # Apply magnetism to all magnetized pucks
-        for magnetized_puck in self.magnetized_pucks.copy():
-            dx = self.rect.centerx - magnetized_puck.x
-            dy = self.rect.centery - magnetized_puck.y
-            distance = math.sqrt(dx ** 2 + dy ** 2)
-
-            # Calculate the direction vector from the puck to the center of the magnet
-            if distance != 0:
-                dx /= distance
-                dy /= distance
-
-            # Calculate the desired distance from the puck to the center of the magnet
-            desired_distance = self.radius - magnetized_puck.radius
-
-            # Cap the velocity if it exceeds the velocity_cap
-            velocity_magnitude = math.sqrt(magnetized_puck.vx ** 2 + magnetized_puck.vy ** 2)
-            if velocity_magnitude > self.velocity_cap:
-                scale_factor = self.velocity_cap / velocity_magnitude
-                magnetized_puck.vx *= scale_factor
-                magnetized_puck.vy *= scale_factor
-
-            # Move the puck towards the center of the magnet with the specified pull_speed
-            move_distance = min(self.pull_speed, desired_distance)
-            magnetized_puck.x += dx * move_distance
-            magnetized_puck.y += dy * move_distance
-
-            # Check if the puck has reached the center of the magnet
-            if distance <= magnetized_puck.radius * 0.001:
-                magnetized_puck.active = False
-                self.magnetized_pucks.remove(magnetized_puck)  # Remove from magnetized pucks set
+        self.magnetized_pucks = SlotSet(puck_world)  # Keep track of magnetized pucks, by slot
+
+    def apply_magnetism(self):
+        # Catch every puck that reaches the magnet's circular area
+        center_x, center_y = self.rect.center
+        self.magnetized_pucks.add(puck_world.resolve_all(puck_world.query_circle(center_x, center_y, self.radius,
+                                                                                 self.kinds)))
+
+        # Apply magnetism to all magnetized pucks in one batch
+        slots = self.magnetized_pucks.slots()
+        if not len(slots):
+            return
+        dx = center_x - puck_world.x[slots]
+        dy = center_y - puck_world.y[slots]
+        distance = np.hypot(dx, dy)
+
+        # Calculate the direction vector from the puck to the center of the magnet
+        moving = distance != 0
+        dx = np.where(moving, dx / np.where(moving, distance, 1.0), dx)
+        dy = np.where(moving, dy / np.where(moving, distance, 1.0), dy)
+
+        # Calculate the desired distance from the puck to the center of the magnet
+        radius = puck_world.radius[slots]
+        desired_distance = self.radius - radius
+
+        # Cap the velocity if it exceeds the velocity_cap
+        vx = puck_world.vx[slots]
+        vy = puck_world.vy[slots]
+        velocity_magnitude = np.hypot(vx, vy)
+        scale_factor = np.where(velocity_magnitude > self.velocity_cap,
+                                self.velocity_cap / np.where(velocity_magnitude > 0, velocity_magnitude, 1.0), 1.0)
+        puck_world.vx[slots] = vx * scale_factor
+        puck_world.vy[slots] = vy * scale_factor
+
+        # Move the pucks towards the center of the magnet with the specified pull_speed
+        move_distance = np.minimum(self.pull_speed, desired_distance)
+        puck_world.x[slots] += dx * move_distance
+        puck_world.y[slots] += dy * move_distance
+
+        # Pucks that have reached the center of the magnet go inactive
+        arrived = slots[distance <= radius * 0.001]
+        puck_world.active[arrived] = False
+        self.magnetized_pucks.discard(arrived)  # Remove from magnetized pucks
 
 # TODO: Fix Inactivity and change to something else and this triggers next level.
 class Goal(Zone):
+    __slots__ = ('scored',)
+    effect = EFFECT_CONTACT
+    overlap_threshold = 0.99
+    kinds = (KIND_PUCK,)
+
     def __init__(self, x, y, width, height):
         super().__init__(x, y, width, height, BLACK, WHITE)
+        self.scored = 0  # Pucks that have reached the goal
 
-    def check_collision(self, puck):
-        puck_left = puck.x - puck.radius
-        puck_right = puck.x + puck.radius
-        puck_top = puck.y - puck.radius
-        puck_bottom = puck.y + puck.radius
-
-        box_left = self.rect.left
-        box_right = self.rect.right
-        box_top = self.rect.top
-        box_bottom = self.rect.bottom
+    def on_contact(self, batch):
+        # Pucks that reach the goal score and go inactive
+        if batch.event == ENTER:
+            puck_world.active[batch.first_slots] = False
+            self.scored += len(batch)
 
-        puck_overlap_x = max(0, min(puck_right, box_right) - max(puck_left, box_left))
-        puck_overlap_y = max(0, min(puck_bottom, box_bottom) - max(puck_top, box_top))
-
-        puck_overlap_area = puck_overlap_x * puck_overlap_y
-        puck_area = math.pi * (puck.radius ** 2)
-
-        if puck_overlap_area >= 0.99 * puck_area:
+    def check_collision(self, puck):
+        if self.overlap_ratio(puck) >= self.overlap_threshold:
             puck.active = False
 
 """
@@ -992,8 +945,15 @@ vvvvvvvvvvvvvvvvvvvvvvvv
 """
 # TODO: Reset spawn_box timers!!!
 def reset(pucks, *spawner_boxes):
-    pucks.clear()
-    static_pucks.clear()
+    pucks.release_all()
+    static_pucks.release_all()
+    commands.clear()
+    contact_solver.clear()
+    body_contacts.clear()
+    zone_effects.contacts.clear()
+    # Build the pucks a level can need up front, so spawning later doesn't allocate
+    for pool in (puck_pool, static_pool, shooter_pool):
+        pool.prewarm(PUCK_POOL_SIZE, 0, 0, 0, 0, 0, PUCK_RADIUS, COLLISION_RADIUS)
     # Define the delay frames
     puck_creation_delay_frames = 0  # Adjust as needed
     # Initialize frame counters
@@ -1016,13 +976,12 @@ def reset(pucks, *spawner_boxes):
     # Create static_pucks with delay
     for i, (x, y, vx, vy, mass) in enumerate(puck_starting_positions):
         if puck_frame_count >= puck_creation_delay_frames:
-            pucks.append(Puck(x, y, vx, vy, mass, PUCK_RADIUS, COLLISION_RADIUS))
+            pucks.acquire(x, y, vx, vy, mass, PUCK_RADIUS, COLLISION_RADIUS)
         puck_frame_count += 1
 
-# TODO: Update for Repulsion Zones when fixed.
-# TODO: Update for new draw functions instead of pygame.
-def render(screen, pucks, shooter_pucks, static_pucks, friction_zones, bumpers, kill_boxes, heavy_friction_zones,
-           boosters, dir_boosters, magnets, spawner_boxes, static_spawners, shooter_spawners, GRID_BORDER):
+#* Draws everything that doesn't move: background, borders, zones, bumpers and spawners.
+def render_static(screen, friction_zones, bumpers, kill_boxes, heavy_friction_zones, boosters, dir_boosters, magnets,
+                  spawner_boxes, static_spawners, shooter_spawners, GRID_BORDER):
     screen.fill(WHITE)
     pygame.draw.rect(screen, BLUE, (0, 0, WIDTH, GRID_BORDER))
     pygame.draw.rect(screen, BLUE, (0, 0, GRID_BORDER, HEIGHT))
@@ -1062,23 +1021,65 @@ def render(screen, pucks, shooter_pucks, static_pucks, friction_zones, bumpers,
     for spawner_box in shooter_spawners:
         pygame.draw.rect(screen, BLUE, spawner_box.rect, 2)
 
+#* Opens the window and sets up everything render() draws with.
+def setup_display():
+    global screen, renderer, sprites, static_layer
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Puck-Wall Collision Simulation")
+    renderer = DirtyRenderer()
+    sprites = get_atlas()
+    # Everything that doesn't move is drawn once into the static layer and blitted each full redraw
+    static_layer = StaticLayer((WIDTH, HEIGHT), lambda surface: render_static(
+        surface, friction_zones, bumpers, kill_boxes, heavy_friction_zones, boosters, dir_boosters, magnets,
+        spawner_boxes, static_spawners, shooter_spawners, GRID_BORDER))
+
+# TODO: Update for Repulsion Zones when fixed.
+# TODO: Update for new draw functions instead of pygame.
+def render(screen, pucks, shooter_pucks, static_pucks, friction_zones, bumpers, kill_boxes, heavy_friction_zones,
+           boosters, dir_boosters, magnets, spawner_boxes, static_spawners, shooter_spawners, GRID_BORDER):
+    # Only the regions that changed are redrawn, renderer.present() then shows them, see DirtyRenderer.
+    # The static scene is cached in static_layer and only redrawn when zones change or a bumper grows.
+    signature = (tuple(map(len, (friction_zones, bumpers, kill_boxes, heavy_friction_zones, boosters, dir_boosters,
+                                 magnets, spawner_boxes, static_spawners, shooter_spawners))),
+                 tuple(int(bumper.radius) for bumper in bumpers))
+    if static_layer.refresh(signature):
+        renderer.background = static_layer.surface
+        renderer.invalidate()
+
+    if renderer.full_redraw:
+        static_layer.blit(screen)
+    else:
+        # Restore the static scene under everything that was drawn last frame
+        renderer.begin(screen)
+
+    batch = []
     for shooter_puck in shooter_pucks:
         if shooter_puck.active:
             # Debug vvv
-            shooter_directional_ray(screen, shooter_puck, GREEN2)
-            pygame.draw.circle(screen, BLUE, (int(shooter_puck.x), int(shooter_puck.y)), shooter_puck.radius)
-
+            rect = shooter_directional_ray(screen, shooter_puck, GREEN2)
+            renderer.draw(shooter_puck, rect)
+            sprite = sprites.circle(shooter_puck.radius, BLUE)
+            renderer.draw(shooter_puck, sprites.add(batch, sprite, (shooter_puck.x, shooter_puck.y)))
+    sprites.draw(screen, batch)
+
+    # Pucks are pre-rasterized sprites, blitted in one batch per layer
+    batch = []
     for puck in pucks:
         if puck.active:
             # Debug vvv
             # directional_ray(screen, puck, GREEN2)
-            pygame.draw.circle(screen, GREEN, (int(puck.x), int(puck.y)), puck.radius)
+            sprite = sprites.circle(puck.radius, GREEN)
+            renderer.draw(puck, sprites.add(batch, sprite, (puck.x, puck.y)))
+    sprites.draw(screen, batch)
 
+    batch = []
     for static_puck in static_pucks:
         if static_puck.active:
             # Debug vvv
             # directional_ray(screen, static_puck, GREEN2)
-            pygame.draw.circle(screen, BLACK, (int(static_puck.x), int(static_puck.y)), static_puck.radius)
+            sprite = sprites.circle(static_puck.radius, BLACK)
+            renderer.draw(static_puck, sprites.add(batch, sprite, (static_puck.x, static_puck.y)))
+    sprites.draw(screen, batch)
 
 """
 Testing / Debug:
@@ -1126,18 +1127,15 @@ friction_zone = FrictionZone(100, 100, 200, 100, 0.965) # 0.965 is standard heav
 
 #                              x   y   W    H    FR
 friction_zone2 = FrictionZone(692, 8, 100, 100, 0.94) # 0.94 is standard for this zone, very heavy FR (slower of the two)
-    # Inside main loop vvv
-    # Apply friction from FrictionZone
-    for puck in pucks:
-        friction_zone.apply_friction(puck)
-        friction_zone2.apply_friction(puck)
+    # Add to friction_zones, zone_phase() applies every zone's effect (EFFECT_FRICTION) in one batch
+    friction_zones.extend([friction_zone, friction_zone2])
+    build_zone_effects()
 --------------------------------------------------
 #                  x   y    W    H
 kill_box = KillBox(8, 468, 124, 124)
-    # Inside main loop vvv
-    # Check for collisions with KillBox
-    for puck in pucks:
-        kill_box.check_collision(puck)
+    # Add to kill_boxes, zone_phase() applies its effect (EFFECT_KILL) with the other zones
+    kill_boxes.append(kill_box)
+    build_zone_effects()
 -------------------------------------------------- 
 #                  x    y    W   H    B
 booster = Booster(600, 132, 32, 300, 4.25) # 4.25 is STANDARD boost multiplier
@@ -1147,23 +1145,21 @@ booster2 = Booster(600, 132, 32, 300, 6.25) # 6.25 is HIGH boost multiplier
 
 #                   x    y    W   H    B 
 booster3 = Booster(600, 132, 32, 300, 9.0) # 9.0 is MAXIMUM boost multiplier
-    # Inside main loop vvv
-    # Apply boost from Booster
-    for puck in pucks:
-        booster.apply_boost(puck)
+    # Add to boosters, zone_phase() applies its effect (EFFECT_BOOST) with the other zones
+    boosters.append(booster)
+    build_zone_effects()
 -------------------------------------------------- 
 #                  x    y    W   H    B  dir
-dir_booster = Booster(600, 132, 32, 300, -45, 75.0) # 75.0 is STANDARD boost multiplier
+dir_booster = DirBooster(600, 132, 32, 300, -45, 75.0) # 75.0 is STANDARD boost multiplier
 
 #                  x    y    W   H    B   dir
-dir_booster2 = Booster(600, 132, 32, 300, -45, 100.0) # 100.0 is HIGH boost multiplier
+dir_booster2 = DirBooster(600, 132, 32, 300, -45, 100.0) # 100.0 is HIGH boost multiplier
 
 #                   x    y    W   H    B  dir
-dir_booster3 = Booster(600, 132, 32, 300, -45, 150.0) # 150.0 is MAXIMUM boost multiplier
-    # Inside main loop vvv
-    # Apply boost from DirBooster
-    for puck in pucks:
-        dir_booster.apply_boost(puck)
+dir_booster3 = DirBooster(600, 132, 32, 300, -45, 150.0) # 150.0 is MAXIMUM boost multiplier
+    # Add to dir_boosters, zone_phase() calls dir_booster.on_contact(batch) as pucks enter, stay in and leave it
+    dir_boosters.append(dir_booster)
+    build_zone_effects()
 --------------------------------------------------
 #                x    y    R  PULL  vCap
 magnet = Magnet(300, 400, 20, 0.25, 10.0) # vCap = velocity cap for puck entry (small radius is 20)
@@ -1174,9 +1170,9 @@ magnet2 = Magnet(300, 400, 30, 0.25, 10.0) # vCap = velocity cap for puck entry
 #                x    y    R  PULL  vCap
 magnet3 = Magnet(300, 400, 50, 0.25, 10.0) # vCap = velocity cap for puck entry (large radius is 50)
     # Inside main loop vvv
-    # Apply magnetism from Magnet
-    for puck in pucks:
-        magnet.apply_magnetism(puck)
+    # Apply magnetism from Magnet, each call pulls every puck inside it in one batch
+    for magnet in magnets:
+        magnet.apply_magnetism()
 --------------------------------------------------
 # Inside main loop vvv (drawing)
     # Draw Zones
@@ -1280,10 +1276,14 @@ spawner_box_zone3.set_parameters(velocity_x=1, velocity_y=1, mass=11, angle=-90)
 Initial Reset:
 vvvvvvvv
 """
-#* Entities
-pucks = []
-static_pucks = []
-shooter_pucks = []
+#* Puck pools, released pucks wait here to be spawned again
+puck_pool = Pool(Puck)
+static_pool = Pool(StaticPuck)
+shooter_pool = Pool(ShooterPuck)
+#* Entities, each puck list acquires from and releases to its own pool
+pucks = EntityList(pool=puck_pool)
+static_pucks = EntityList(pool=static_pool)
+shooter_pucks = EntityList(pool=shooter_pool)
 resting_pucks = []
 ice_cubes = []
 skulls = []
@@ -1301,69 +1301,109 @@ boosters = []
 dir_boosters = []
 friction_zones = []
 heavy_friction_zones = []
-
-#* Reset
-reset(pucks, *spawner_boxes)
+goals = []
+triggers = []
+#* Spawns, kills and conversions queued during a tick, applied together by cleanup_phase()
+commands = CommandBuffer()
+#* Zone effects (zones never move, so the table is built once per level)
+def build_zone_effects():
+    global zone_effects
+    zone_effects = ZoneEffects(kill_boxes + friction_zones + heavy_friction_zones + boosters + dir_boosters + goals +
+                               triggers)
+    # Fast pucks stop where they enter a zone instead of jumping over it
+    puck_world.sweep_tests[:] = [zone_effects.sweep]
+
+build_zone_effects()
 
 """
-Main Loop:
-vvvvvvvvvv
+Level Loading:
+vvvvvvvvvvvvvv
 """
-# TODO: Add all functionality for shooter_puck interactions.
-running = True
-while running:
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-
-    #* Frame Rate Settings
-    dt = clock.tick(FPS) / 120.0
-
+#* Replaces the level above with one described by a dict, e.g. read from a JSON file.
+def load_level(level):
     """
-    Entity Cross Collision Logic:
-    vvvvvvvvvvvvvvvvvvvvvvvv
+    Load a level definition, replacing every spawner, zone, bumper and puck.
+
+    Args:
+        level (dict): Any of these keys, each a list; a missing key means none of that thing.
+            "pucks":                [x, y, vx, vy, mass]
+            "spawner_boxes", "static_spawners", "shooter_spawners":
+                                    {"x", "y", "width", "height", "spawn_cooldown", "initial_spawn_delay",
+                                     "velocity_x", "velocity_y", "mass", "angle"}
+            "kill_boxes", "goals":  [x, y, width, height]
+            "friction_zones", "heavy_friction_zones": [x, y, width, height, friction]
+            "boosters":             [x, y, width, height, boost_velocity]
+            "dir_boosters":         [x, y, width, height, angle, boost_velocity]
+            "magnets":              [x, y, radius, pull_speed, velocity_cap]
+            "bumpers":              [x, y, initial_radius, initial_mass, growth_rate, target_radius]
+            "lives" (int) is optional and defaults to MAX_LIVES.
     """
-    # Handle cross collisions between pucks and static_pucks
-    cross_collisions(pucks, pucks)
-    # Handle cross collisions between pucks and static_pucks
-    cross_collisions(pucks, static_pucks)
-    # Handle cross collisions between pucks and ice_cubes
-    cross_collisions(pucks, ice_cubes)
-    # Handle cross collisions between pucks and shooter_pucks
-    cross_collisions(pucks, shooter_pucks)
-    # Handle cross collisions between shooter_pucks
-    cross_collisions(shooter_pucks, shooter_pucks)
-    # Handle cross collisions between shooter_pucks and ice_cubes
-    cross_collisions(shooter_pucks, ice_cubes)
-    # Handle cross collisions between static_pucks and shooter_pucks
-    cross_collisions(static_pucks, shooter_pucks)
-    # Handle cross collisions between static_pucks
-    cross_collisions(static_pucks, static_pucks)
-    # Handle cross collisions between ice_cubes and static_pucks
-    cross_collisions(ice_cubes, static_pucks)
-    # Handle cross collisions between ice_cubes
-    cross_collisions(ice_cubes, ice_cubes)
-
-    # TODO: Eventually update these for loops when all classes are stored in lists.
-    # Check for collisions with KillBox
-    for puck in pucks:
-        kill_box.check_collision(puck)
-        kill_box2.check_collision(puck)
-        kill_box3.check_collision(puck)
-        kill_box4.check_collision(puck)
+    global lives
+
+    def spawners(key, color):
+        boxes = []
+        for spec in level.get(key, []):
+            box = SpawnerBox(spec["x"], spec["y"], spec.get("width", 24), spec.get("height", 24), color, color,
+                             spawn_cooldown=spec.get("spawn_cooldown", 1000),
+                             initial_spawn_delay=spec.get("initial_spawn_delay", 0))
+            box.set_parameters(velocity_x=spec.get("velocity_x", 0), velocity_y=spec.get("velocity_y", 0),
+                               mass=spec.get("mass", 6), angle=spec.get("angle", 0))
+            boxes.append(box)
+        return boxes
+
+    shooter_pucks.release_all()
+    # Lists are refilled in place, everything else holds on to them
+    spawner_boxes[:] = spawners("spawner_boxes", PURPLE)
+    static_spawners[:] = spawners("static_spawners", PURPLE)
+    shooter_spawners[:] = spawners("shooter_spawners", BLUE)
+    kill_boxes[:] = [KillBox(*args) for args in level.get("kill_boxes", [])]
+    goals[:] = [Goal(*args) for args in level.get("goals", [])]
+    friction_zones[:] = [FrictionZone(*args) for args in level.get("friction_zones", [])]
+    heavy_friction_zones[:] = [FrictionZone(*args) for args in level.get("heavy_friction_zones", [])]
+    boosters[:] = [Booster(*args) for args in level.get("boosters", [])]
+    dir_boosters[:] = [DirBooster(*args) for args in level.get("dir_boosters", [])]
+    magnets[:] = [Magnet(*args) for args in level.get("magnets", [])]
+    bumpers[:] = [Bumper(x, y, radius, mass, growth_rate, PURPLE2, target_radius=target_radius)
+                  for x, y, radius, mass, growth_rate, target_radius in level.get("bumpers", [])]
+    puck_starting_positions[:] = [tuple(puck) for puck in level.get("pucks", [])]
+    lives = level.get("lives", MAX_LIVES)
+
+    build_zone_effects()
+    reset(pucks, *spawner_boxes)
 
-    # Check for collisions with KillBox (static_puck)
-    for static_puck in static_pucks:
-        kill_box.check_static_collision(static_puck)
-        kill_box2.check_static_collision(static_puck)
-        kill_box3.check_static_collision(static_puck)
-        kill_box4.check_static_collision(static_puck)
+#* Reset
+reset(pucks, *spawner_boxes)
 
+"""
+Simulation Step:
+vvvvvvvvvvvvvvvv
+"""
+#* Each phase advances one part of the simulation by dt, step() runs them in order.
+def broadphase_phase(dt):
+    # Update the broadphase grid with this frame's positions
+    sync_broadphase((KIND_PUCK, LAYER_PUCK), (KIND_STATIC, LAYER_STATIC), (KIND_ICE, LAYER_ICE),
+                    (KIND_SHOOTER, LAYER_SHOOTER))
+
+def narrowphase_phase(dt):
+    # Handle collisions between every pair of layers in collision_layers
+    layer_collisions(collision_layers)
+    # Tell the subscribers which contacts began, carried on and ended this tick
+    contacts = puck_world.contacts()
+    body_contacts.update(puck_world, contacts[:, 0], contacts[:, 1])
+    # Resolve every circle contact found above together
+    contact_solver.solve(puck_world)
+
+def zone_phase(dt):
+    # Apply the effects of every KillBox, FrictionZone and Booster in one batched pass,
+    # DirBoosters, Goals and triggers hear only when pucks enter, stay in and leave them
+    zone_effects.apply(puck_world)
+
+def bumper_phase(dt):
     for bumper in bumpers:
         bumper.update(dt)
 
     for bumper in bumpers:
-        bumper_collision(bumper, pucks, static_pucks)
+        bumper_collision(bumper)
 
     # Check for triggering condition with regular pucks
     for bumper in bumpers:
@@ -1378,216 +1418,152 @@ while running:
                 if bumper.trigger_condition(static_puck):
                     bumper.trigger()
 
+def spawn_phase(dt):
     # Spawn pucks with spawner_boxes[] list
     for spawner_box in spawner_boxes:
         spawner_box.spawn_puck(pucks, dt)
 
-    # Spawn pucks with static_spawner[] list
+    # Spawn static pucks with static_spawner[] list, they stop at rest instead of going inactive
     for spawner_box in static_spawners:
-        spawner_box.spawn_puck(static_pucks, dt)
+        spawner_box.spawn_static_puck(static_pucks, dt)
 
-    # Spawn pucks with static_spawner[] list
+    # Spawn shooter pucks with shooter_spawner[] list
     for spawner_box in shooter_spawners:
-        spawner_box.spawn_puck(shooter_pucks, dt)
-
-    # Apply boost from Booster
-    # for puck in pucks:
-        # booster.apply_boost(puck)
-
-    # Apply boost from DirBooster
-    # for puck in pucks:
-        # dir_booster.apply_boost(puck)
+        spawner_box.spawn_shooter_puck(shooter_pucks, dt)
 
     # Apply magnetism from Magnet
-    # for puck in pucks:
-        # magnet.apply_magnetism(puck)
-
-    # Apply friction from FrictionZone
-    # for puck in pucks:
-        # friction_zone.apply_friction(puck)
-        # friction_zone2.apply_friction(puck)
-
-    # Check for collisions with FrictionZone (static_puck)
-    # for static_puck in static_pucks:
-        # friction_zone.apply_static_friction(static_puck)
-        # friction_zone2.apply_static_friction(static_puck)
-
-    # Check for collisions with Booster (static_puck)
-    # for static_puck in static_pucks:
-        # booster.apply_static_boost(static_puck)
-
-    # Check for collisions with Booster (static_puck)
-    # for static_puck in static_pucks:
-        # dir_booster.apply_static_boost(static_puck)
+    # for magnet in magnets:
+        # magnet.apply_magnetism()
 
     # TODO: Add ice_cube interactions.
         # TODO: Add additional functionality for ice_cubes to reset to original location 6 frames after one becomes inactive.
 
+def bumper_push_phase(dt):
     """
     Bumper Collision Logic:
     vvvvvvvvvvvvvvvvvvvvvvvv
+    bumper.collide() takes no arguments, it queries puck_world for the bodies of bumper.kinds it touches
     """
-    # Check for collisions with regular pucks
-    for puck in pucks:
-        if bumper.collide([puck], static_pucks):  # Check collision with regular pucks and static pucks
-            # Handle collision response here (e.g., apply forces, change velocities, etc.) for regular pucks
-            # Example collision response for regular pucks (you can modify this as needed):
-            dx = puck.x - bumper.x
-            dy = puck.y - bumper.y
-            distance = math.sqrt(dx ** 2 + dy ** 2)
-            penetration = bumper.collision_radius + puck.collision_radius - distance
-            if penetration > 0:
-                # Calculate normal and apply force to separate pucks
-                normal_x = dx / distance
-                normal_y = dy / distance
-                force = penetration * 0.5  # Adjust this value as needed
-                puck.x += normal_x * force
-                puck.y += normal_y * force
-
-    # Check for collisions with static pucks
-    for static_puck in static_pucks:
-        if bumper.collide([static_puck], pucks + static_pucks):  # Check collision with all pucks and static pucks
-            # Handle collision response here (e.g., apply forces, change velocities, etc.) for static pucks
-            # Example collision response for static pucks (you can modify this as needed):
-            dx = static_puck.x - bumper.x
-            dy = static_puck.y - bumper.y
-            distance = math.sqrt(dx ** 2 + dy ** 2)
-            penetration = bumper.collision_radius + static_puck.collision_radius - distance
-            if penetration > 0:
-            # Calculate normal and apply force to separate pucks
-                normal_x = dx / distance
-                normal_y = dy / distance
-                force = penetration * 0.5  # Adjust this value as needed
-                static_puck.x += normal_x * force
-                static_puck.y += normal_y * force
+    # Anything touching a bumper triggers it, found with one world query per bumper
+    for bumper in bumpers:
+        bumper.collide()
 
+def integrate_phase(dt):
     """
     Movement and Update Logic:
     vvvvvvvvvvvvvvvvvvvvvvvv
     """
-    # Move and update pucks
-    for puck in pucks:
-        if puck.active:
-            puck.vx *= 0.991
-            puck.vy *= 0.991
-
-            puck.x += puck.vx * dt
-            puck.y += puck.vy * dt
+    # Move and update pucks, shooter_pucks, static_pucks and IceCubes in one batch
+    # TODO: Eventually fix this to not kill pucks for inactivity, instead should trigger duckState.
+    puck_world.step(dt)
 
-            if (puck.x - puck.radius < GRID_BORDER) and puck.vx < 0:
-                puck.vx = -puck.vx
-            elif (puck.x + puck.radius > WIDTH - GRID_BORDER) and puck.vx > 0:
-                puck.vx = -puck.vx
+    # Shooter pucks get heavier as they slow down, then turn into regular pucks
+    puck_world.mass[puck_world.slower_than(KIND_SHOOTER, MIN_VELOCITY_THRESHOLD_3)] = 24
+    for slot in puck_world.slower_than(KIND_SHOOTER, MIN_VELOCITY_THRESHOLD_2):
+        shooter_puck = puck_world.owners[slot]
+        commands.convert(shooter_puck, shooter_pucks, pucks, shooter_puck.x, shooter_puck.y,
+                         shooter_puck.vx, shooter_puck.vy, 12, PUCK_RADIUS, COLLISION_RADIUS)
 
-            if (puck.y - puck.radius < GRID_BORDER) and puck.vy < 0:
-                puck.vy = -puck.vy
-            elif (puck.y + puck.radius > HEIGHT - GRID_BORDER) and puck.vy > 0:
-                puck.vy = -puck.vy
-
-            # TODO: Eventually fix this to not kill pucks for inactivity, instead should trigger duckState.
-            velocity_magnitude = math.sqrt(puck.vx ** 2 + puck.vy ** 2)
-            if velocity_magnitude < MIN_VELOCITY_THRESHOLD:
-                puck.active = False
-
-    # Move and update shooter_pucks
-    for shooter_puck in shooter_pucks:
-        if shooter_puck.active:
-            shooter_puck.vx *= 0.991
-            shooter_puck.vy *= 0.991
-
-            shooter_puck.x += shooter_puck.vx * dt
-            shooter_puck.y += shooter_puck.vy * dt
-
-            if (shooter_puck.x - shooter_puck.radius < GRID_BORDER) and shooter_puck.vx < 0:
-                shooter_puck.vx = -shooter_puck.vx
-            elif (shooter_puck.x + shooter_puck.radius > WIDTH - GRID_BORDER) and shooter_puck.vx > 0:
-                shooter_puck.vx = -shooter_puck.vx
-
-            if (shooter_puck.y - shooter_puck.radius < GRID_BORDER) and shooter_puck.vy < 0:
-                shooter_puck.vy = -shooter_puck.vy
-            elif (shooter_puck.y + shooter_puck.radius > HEIGHT - GRID_BORDER) and shooter_puck.vy > 0:
-                shooter_puck.vy = -shooter_puck.vy
-
-            velocity_magnitude_static = math.sqrt(shooter_puck.vx ** 2 + shooter_puck.vy ** 2)
-            if velocity_magnitude_static < MIN_VELOCITY_THRESHOLD_3:
-                shooter_puck.active = True
-                shooter_puck.mass = 24
-
-            velocity_magnitude_static = math.sqrt(shooter_puck.vx ** 2 + shooter_puck.vy ** 2)
-            if velocity_magnitude_static < MIN_VELOCITY_THRESHOLD_2:
-                regular_puck = Puck(shooter_puck.x, shooter_puck.y, shooter_puck.vx, shooter_puck.vy, 12, PUCK_RADIUS, COLLISION_RADIUS)
-                shooter_pucks.remove(shooter_puck)
-                pucks.append(regular_puck)
-
-    # Move and update static_pucks
-    for static_puck in static_pucks:
-        if static_puck.active:
-            static_puck.vx *= 0.991
-            static_puck.vy *= 0.991
-
-            static_puck.x += static_puck.vx * dt
-            static_puck.y += static_puck.vy * dt
-
-            if (static_puck.x - static_puck.radius < GRID_BORDER) and static_puck.vx < 0:
-                static_puck.vx = -static_puck.vx
-            elif (static_puck.x + static_puck.radius > WIDTH - GRID_BORDER) and static_puck.vx > 0:
-                static_puck.vx = -static_puck.vx
-
-            if (static_puck.y - static_puck.radius < GRID_BORDER) and static_puck.vy < 0:
-                static_puck.vy = -static_puck.vy
-            elif (static_puck.y + static_puck.radius > HEIGHT - GRID_BORDER) and static_puck.vy > 0:
-                static_puck.vy = -static_puck.vy
-
-            velocity_magnitude_static = math.sqrt(static_puck.vx ** 2 + static_puck.vy ** 2)
-            if velocity_magnitude_static < MIN_VELOCITY_THRESHOLD:
-                static_puck.active = True
-                static_puck.vx = 0
-                static_puck.vy = 0
-
-    # Move and update IceCubes
-    for ice_cube in ice_cubes:
-        if ice_cube.active:
-            ice_cube.vx *= 0.998
-            ice_cube.vy *= 0.998
-
-            ice_cube.x += ice_cube.vx * dt
-            ice_cube.y += ice_cube.vy * dt
-
-            if (ice_cube.x - (ice_cube.width / 2) < GRID_BORDER) and ice_cube.vx < 0:
-                ice_cube.vx = -ice_cube.vx
-            elif (ice_cube.x + (ice_cube.width / 2) > WIDTH - GRID_BORDER) and ice_cube.vx > 0:
-                ice_cube.vx = -ice_cube.vx
-
-            if (ice_cube.y - (ice_cube.height / 2) < GRID_BORDER) and ice_cube.vy < 0:
-                ice_cube.vy = -ice_cube.vy
-            elif (ice_cube.y + (ice_cube.height / 2) > HEIGHT - GRID_BORDER) and ice_cube.vy > 0:
-                ice_cube.vy = -ice_cube.vy
-
-            velocity_magnitude_ice = math.sqrt(ice_cube.vx ** 2 + ice_cube.vy ** 2)
-            if velocity_magnitude_ice < MIN_VELOCITY_THRESHOLD:
-                ice_cube.active = True
-                ice_cube.vx = 0
-                ice_cube.vy = 0
+    if DETERMINISTIC and HASH_LOG:
+        tick_hashes.record(puck_world)
 
     # TODO: Update rand_angle once per every 2 frames.
 
-    # Call the draw_game function to handle drawing
-    render(screen, pucks, shooter_pucks, static_pucks, friction_zones, bumpers, kill_boxes, heavy_friction_zones,
-           boosters, dir_boosters, magnets, spawner_boxes, static_spawners, shooter_spawners, GRID_BORDER)
-
-    pygame.display.flip()
-
-    pucks = [puck for puck in pucks if puck.active]
+def cleanup_phase(dt):
+    global lives
+    # Only the pucks that died this tick are visited, then every queued change is applied at once
+    for slot in puck_world.dead_slots():
+        entity = puck_world.owners[slot]
+        for entities in (pucks, static_pucks, shooter_pucks):
+            if entity in entities:
+                commands.destroy(entities, entity)
+    commands.flush()
     # TODO: Add mxpucks variable to calc when there is 50 static_pucks active at one time how many static pucks
 
     if not pucks:
         lives -= 1
         if lives > 0:
             reset(pucks)
-        else:
-            running = False
 
-    pygame.display.flip()
+#* Phases in the order step() runs them, each timed by the profiler under its name
+PHASES = [
+    ("broadphase", broadphase_phase),
+    ("narrowphase", narrowphase_phase),
+    ("zones", zone_phase),
+    ("bumpers", bumper_phase),
+    ("spawners", spawn_phase),
+    ("bumper_push", bumper_push_phase),
+    ("integrate", integrate_phase),
+    ("cleanup", cleanup_phase),
+]
+
+def step(dt):
+    """
+    Advance the simulation one frame without drawing anything.
+
+    Args:
+        dt (float): Frame time, as clock.tick(FPS) / 120.0 gives it.
+
+    Returns:
+        bool: True while there are lives left.
+    """
+    for name, phase in PHASES:
+        with profiler.scope(name), tracer.span(name, "physics"):
+            phase(dt)
+    return lives > 0
+
+"""
+Main Loop:
+vvvvvvvvvv
+"""
+# TODO: Add all functionality for shooter_puck interactions.
+def main():
+    pygame.init()
+    setup_display()
+
+    show_profile = PROFILE
+    running = True
+    while running:
+        #* Frame Rate Settings
+        dt = clock.tick(FPS) / 120.0
+        profiler.begin_frame()
+
+        with profiler.scope("events"), tracer.span("events", "frame"):
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3 and profiler.enabled:
+                    show_profile = not show_profile
+
+        if not step(dt):
+            running = False
 
-pygame.quit()
-sys.exit()
\ No newline at end of file
+        # Call the draw_game function to handle drawing
+        with profiler.scope("render"), tracer.span("render", "frame"):
+            render(screen, pucks, shooter_pucks, static_pucks, friction_zones, bumpers, kill_boxes,
+                   heavy_friction_zones, boosters, dir_boosters, magnets, spawner_boxes, static_spawners,
+                   shooter_spawners, GRID_BORDER)
+            if show_profile:
+                renderer.draw(profiler, profiler.draw(screen))
+        with profiler.scope("flip"), tracer.span("flip", "frame"):
+            renderer.present()
+        profiler.end_frame()
+        if tracer.enabled:
+            tracer.counter("entities", {"pucks": len(pucks), "static_pucks": len(static_pucks),
+                                        "shooter_pucks": len(shooter_pucks)})
+
+    if PROFILE and PROFILE_EXPORT:
+        profiler.export(PROFILE_EXPORT)
+    if TRACE:
+        tracer.save(TRACE)
+    if DETERMINISTIC and HASH_LOG:
+        if tick_hashes.reference is None:
+            tick_hashes.save(HASH_LOG)
+        elif tick_hashes.diverged_at is not None:
+            print("Diverged from", HASH_LOG, "at tick", tick_hashes.diverged_at)
+
+    pygame.quit()
+    sys.exit()
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
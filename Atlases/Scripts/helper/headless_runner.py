@@ -0,0 +1,119 @@
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import time
+
+# Steps the engine for a number of ticks as fast as it can, with nothing drawn,
+# reporting ticks/sec, entity counts and the time spent in each phase.
+#   python headless_runner.py [--level level.json] [--ticks N] [--json out.json] [--trace frames.csv]
+
+# No window, no sound, and simulated time so spawners fire on tick count rather than wall time
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('DARING_DETERMINISTIC', '1')
+
+import pygame
+
+# Constants
+ENGINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'core', 'engine_0.75.py')
+TICKS = 5000
+
+
+def load_engine(path=ENGINE_PATH):
+    # the engine file name isn't a valid module name, so load it by path
+    spec = importlib.util.spec_from_file_location('daring_engine', path)
+    engine = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(engine)
+    return engine
+
+
+def entity_counts(engine):
+    world = engine.puck_world
+    live = world.active[:world.count]
+    return {
+        "pucks": len(engine.pucks),
+        "static_pucks": len(engine.static_pucks),
+        "shooter_pucks": len(engine.shooter_pucks),
+        "ice_cubes": len(engine.ice_cubes),
+        "bodies": int(live.sum()),
+        "sleeping": int((live & world.sleeping[:world.count]).sum()),
+    }
+
+
+def run(engine, ticks):
+    clock = engine.clock
+    if hasattr(clock, 'pace'):
+        clock.pace = None   # don't hold the simulated clock to real time
+    dt = 1000.0 / engine.FPS / 120.0
+    profiler = engine.profiler
+    profiler.enabled = True
+    profiler.window = ticks     # percentiles over the whole run
+    profiler.reset()
+    peak = entity_counts(engine)
+    done = 0
+    start = time.perf_counter()
+    while done < ticks:
+        clock.tick(engine.FPS)
+        profiler.begin_frame()
+        alive = engine.step(dt)
+        profiler.end_frame()
+        done += 1
+        counts = entity_counts(engine)
+        for key, value in counts.items():
+            peak[key] = max(peak[key], value)
+        if not alive:
+            break
+    elapsed = time.perf_counter() - start
+    return {
+        "ticks": done,
+        "seconds": elapsed,
+        "ticks_per_second": done / elapsed if elapsed else 0.0,
+        "entities": entity_counts(engine),
+        "peak_entities": peak,
+        "phases_ms": {name: stats for name, stats in profiler.summary().items() if stats["mean"]},
+        "lives": engine.lives,
+    }
+
+
+def report(results):
+    print("{} ticks in {:.2f}s, {:,.0f} ticks/sec".format(
+        results["ticks"], results["seconds"], results["ticks_per_second"]))
+    print("{:>14} {:>8} {:>8}".format("entities", "final", "peak"))
+    for key, value in results["entities"].items():
+        print("{:>14} {:>8} {:>8}".format(key, value, results["peak_entities"][key]))
+    print("{:>14} {:>9} {:>9} {:>9} {:>9}".format("phase ms", "mean", "p50", "p95", "p99"))
+    for name, stats in results["phases_ms"].items():
+        print("{:>14} {:>9.4f} {:>9.4f} {:>9.4f} {:>9.4f}".format(
+            name, stats["mean"], stats["p50"], stats["p95"], stats["p99"]))
+    print("lives left", results["lives"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Step the engine headless and report its speed.")
+    parser.add_argument('--level', help="level definition (JSON), see load_level() in the engine")
+    parser.add_argument('--ticks', type=int, default=TICKS)
+    parser.add_argument('--json', help="also write the results to this file")
+    parser.add_argument('--trace', help="write every tick's phase times to this .csv or .json file")
+    args = parser.parse_args()
+
+    pygame.init()
+    engine = load_engine()
+    if args.level:
+        with open(args.level) as f:
+            engine.load_level(json.load(f))
+
+    results = run(engine, args.ticks)
+    report(results)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.trace:
+        engine.profiler.export(args.trace)
+
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
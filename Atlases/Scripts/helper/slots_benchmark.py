@@ -0,0 +1,118 @@
+import gc
+import sys
+import time
+import tracemalloc
+
+from headless_runner import load_engine
+
+import pygame
+
+# Compares the dict based puck entity the engine started with against the engine's own
+# Puck, a slotted PuckView whose numbers live in puck_world columns, reporting bytes
+# per entity and attribute access throughput. The engine moves its pucks through the
+# columns in one batch rather than attribute by attribute, so that is measured too.
+#   python slots_benchmark.py [count ...]
+
+# Constants
+COUNTS = [10000, 100000]
+ACCESS_ROUNDS = 5
+DT = 1 / 120
+
+
+# Entity attributes as they were before the engine classes were slotted
+class DictPuck:
+    def __init__(self, x, y, vx, vy, mass, drawn_radius, collision_radius, mask):
+        self.x = x
+        self.y = y
+        self.vx = vx
+        self.vy = vy
+        self.mass = mass
+        self.radius = drawn_radius
+        self.collision_radius = collision_radius
+        self.active = True
+        self.rect = pygame.Rect(x - collision_radius, y - collision_radius, collision_radius * 2, collision_radius * 2)
+        self.mask = mask
+
+
+def build_dict(engine, count):
+    mask = engine.circle_mask(engine.COLLISION_RADIUS)   # shared by every entity, as with mask_cache
+    return [DictPuck(float(i % 800), float(i % 600), 1.5, -2.5, 6, engine.PUCK_RADIUS, engine.COLLISION_RADIUS, mask)
+            for i in range(count)]
+
+
+def build_puck(engine, count):
+    return [engine.Puck(float(i % 800), float(i % 600), 1.5, -2.5, 6, engine.PUCK_RADIUS, engine.COLLISION_RADIUS)
+            for i in range(count)]
+
+
+def discard(entities):
+    # give the world slots back, so every build starts from the same free list
+    for entity in entities:
+        if hasattr(entity, 'despawn'):
+            entity.despawn()
+
+
+def bytes_per_entity(engine, build, count):
+    gc.collect()
+    tracemalloc.start()
+    entities = build(engine, count)
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # the list holding them costs the same for both, leave it out; any world columns grown are counted
+    size -= sys.getsizeof(entities)
+    discard(entities)
+    return size / count
+
+
+def accesses_per_second(engine, build, count):
+    entities = build(engine, count)
+    start = time.perf_counter()
+    for _ in range(ACCESS_ROUNDS):
+        for e in entities:
+            # 4 reads and 2 writes, like a movement update
+            e.x += e.vx * DT
+            e.y += e.vy * DT
+    elapsed = time.perf_counter() - start
+    discard(entities)
+    return 6 * count * ACCESS_ROUNDS / elapsed
+
+
+def column_accesses_per_second(engine, count):
+    # the same update as one batch over the world columns, the way puck_world.step() moves pucks
+    entities = build_puck(engine, count)
+    world = engine.puck_world
+    slots = world.live_slots()
+    start = time.perf_counter()
+    for _ in range(ACCESS_ROUNDS):
+        world.x[slots] += world.vx[slots] * DT
+        world.y[slots] += world.vy[slots] * DT
+    elapsed = time.perf_counter() - start
+    discard(entities)
+    return 6 * count * ACCESS_ROUNDS / elapsed
+
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or COUNTS
+    pygame.init()
+    engine = load_engine()
+    engine.pucks.release_all()
+    engine.static_pucks.release_all()
+
+    print("{:>8} {:>10} {:>12} {:>16}".format("count", "class", "bytes/each", "accesses/sec"))
+    for count in counts:
+        dict_size = bytes_per_entity(engine, build_dict, count)
+        dict_speed = accesses_per_second(engine, build_dict, count)
+        print("{:>8} {:>10} {:>12.1f} {:>16,.0f}".format(count, "DictPuck", dict_size, dict_speed))
+        puck_size = bytes_per_entity(engine, build_puck, count)
+        puck_speed = accesses_per_second(engine, build_puck, count)
+        print("{:>8} {:>10} {:>12.1f} {:>16,.0f}".format(count, "Puck", puck_size, puck_speed))
+        column_speed = column_accesses_per_second(engine, count)
+        print("{:>8} {:>10} {:>12} {:>16,.0f}".format(count, "columns", "", column_speed))
+        print("{:>8} {:>10} {:>+11.0%} {:>15.2f}x {:>8.2f}x batched".format(
+            count, "vs dict", puck_size / dict_size - 1, puck_speed / dict_speed, column_speed / dict_speed))
+
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+logger.debug("importing...")
+
+# Swept tests for continuous collision detection. Motion is given as a start point and
+# the displacement over one step; times are fractions of that step, 0.0 - 1.0.
+
+
+def circle_circle_toi(x, y, dx, dy, other_x, other_y, other_dx, other_dy, radius):
+    """first time the centers of two moving circles come within radius of each other
+
+    Circles already closer than radius, or moving apart, report no impact; resolving
+    those is up to the narrowphase.
+
+    Args:
+        x, y, dx, dy: start and displacement of the first circle
+        other_x, other_y, other_dx, other_dy: start and displacement of the second circle
+        radius: sum of the radii
+        any argument may be an array, they broadcast
+
+    Returns:
+        array of times in [0, 1], inf where there is no impact this step
+    """
+    wx = np.subtract(x, other_x)
+    wy = np.subtract(y, other_y)
+    ux = np.subtract(dx, other_dx)
+    uy = np.subtract(dy, other_dy)
+    a = ux * ux + uy * uy
+    b = 2.0 * (wx * ux + wy * uy)
+    c = wx * wx + wy * wy - np.square(radius)
+    disc = b * b - 4.0 * a * c
+    hit = (c >= 0) & (b < 0) & (disc >= 0) & (a > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = (-b - np.sqrt(np.where(hit, disc, 0.0))) / (2.0 * a)
+    return np.where(hit & (t <= 1.0), np.clip(t, 0.0, 1.0), np.inf)
+
+
+def segment_aabb_toi(x, y, dx, dy, left, top, right, bottom):
+    """slab test of a moving point against axis aligned boxes
+
+    Args:
+        x, y, dx, dy: start and displacement of the point
+        left, top, right, bottom: box bounds
+        any argument may be an array, they broadcast
+
+    Returns:
+        (enter, leave): times the point enters and leaves each box along the unbounded
+        line; the line misses the box where enter > leave. Check enter and leave against
+        0 and 1 for the part covered this step.
+    """
+    x, y, dx, dy, left, top, right, bottom = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (x, y, dx, dy, left, top, right, bottom)))
+    enter = np.full(x.shape, -np.inf)
+    leave = np.full(x.shape, np.inf)
+    for start, delta, low, high in ((x, dx, left, right), (y, dy, top, bottom)):
+        moving = delta != 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t_low = (low - start) / delta
+            t_high = (high - start) / delta
+        near = np.where(moving, np.minimum(t_low, t_high), -np.inf)
+        far = np.where(moving, np.maximum(t_low, t_high), np.inf)
+        # not moving on this axis: inside the slab always, outside it never
+        outside = ~moving & ((start < low) | (start > high))
+        near = np.where(outside, np.inf, near)
+        far = np.where(outside, -np.inf, far)
+        enter = np.maximum(enter, near)
+        leave = np.minimum(leave, far)
+    return enter, leave
+
+
+logger.debug("imported")
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+import logging
+
+logger = logging.getLogger(__name__)
+logger.debug("importing...")
+
+
+class EntityList:
+
+    def __init__(self, entities=(), pool=None):
+        """unordered list of entities with O(1) membership and removal
+
+        remove() moves the last entity into the removed one's place instead of shifting
+        everything after it, so iteration order changes as entities come and go. Entities
+        are their own handles: they hash by identity and keep them while in the list.
+
+        Don't add or remove while iterating; queue the change on a CommandBuffer instead.
+
+        Args:
+            entities: initial entities
+            pool: pool.Pool the list's entities come from and go back to, through
+                acquire() and release(); a CommandBuffer needs one
+        """
+        self._items = []
+        self._index = {}    # entity -> position in _items
+        self.pool = pool
+        self.extend(entities)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def __contains__(self, entity):
+        return entity in self._index
+
+    def __add__(self, other):
+        return self._items + list(other)
+
+    def __radd__(self, other):
+        return list(other) + self._items
+
+    def __repr__(self):
+        return f'EntityList({self._items!r})'
+
+    def append(self, entity):
+        if entity not in self._index:
+            self._index[entity] = len(self._items)
+            self._items.append(entity)
+
+    def extend(self, entities):
+        for entity in entities:
+            self.append(entity)
+
+    def swap_remove(self, entity):
+        """remove entity by moving the last entity into its place; KeyError if absent"""
+        index = self._index.pop(entity)
+        last = self._items.pop()
+        if last is not entity:
+            self._items[index] = last
+            self._index[last] = index
+
+    remove = swap_remove
+
+    def acquire(self, *args, **kwargs):
+        """append pool.acquire(*args, **kwargs) and return it"""
+        if self.pool is None:
+            raise ValueError("entity list has no pool to acquire from")
+        entity = self.pool.acquire(*args, **kwargs)
+        self.append(entity)
+        return entity
+
+    def release(self, entity):
+        """remove entity and release it to the pool; KeyError if absent"""
+        self.swap_remove(entity)
+        self.pool.release(entity)
+
+    def release_all(self):
+        """release every entity to the pool and empty the list"""
+        for entity in self._items:
+            self.pool.release(entity)
+        self.clear()
+
+    def clear(self):
+        self._items.clear()
+        self._index.clear()
+
+
+class CommandBuffer:
+
+    def __init__(self):
+        """queues entity creation, destruction and conversion during a tick
+
+        Nothing changes until flush(), the sync point, so entity lists can be iterated
+        freely while commands are queued. flush() releases everything first, then acquires,
+        so the pools hand the objects just released straight back out.
+
+        Entities live in EntityLists and come from and go back to each list's own pool, so
+        an entity is always released to the pool it was acquired from.
+        """
+        self._destroys = []     # (entities, entity)
+        self._converts = []     # (entity, source, target, args, kwargs)
+        self._creates = []      # (entities, args, kwargs)
+
+    def __len__(self):
+        return len(self._destroys) + len(self._converts) + len(self._creates)
+
+    def create(self, entities, *args, **kwargs):
+        """at flush, entities.acquire(*args, **kwargs)"""
+        if entities.pool is None:
+            raise ValueError("entity list has no pool to acquire from")
+        self._creates.append((entities, args, kwargs))
+
+    def destroy(self, entities, entity):
+        """at flush, entities.release(entity); repeats are ignored"""
+        self._destroys.append((entities, entity))
+
+    def convert(self, entity, source, target, *args, **kwargs):
+        """at flush, release entity from source and target.acquire(*args, **kwargs)
+
+        Skipped if entity was destroyed or converted earlier in the same flush.
+        """
+        if target.pool is None:
+            raise ValueError("entity list has no pool to acquire from")
+        self._converts.append((entity, source, target, args, kwargs))
+
+    def clear(self):
+        self._destroys = []
+        self._converts = []
+        self._creates = []
+
+    def flush(self):
+        """apply every queued command in one pass and return how many changed something"""
+        destroys, converts, creates = self._destroys, self._converts, self._creates
+        self.clear()
+        applied = 0
+        for entities, entity in destroys:
+            if entity in entities:
+                entities.release(entity)
+                applied += 1
+        acquires = []
+        for entity, source, target, args, kwargs in converts:
+            if entity in source:
+                source.release(entity)
+                acquires.append((target, args, kwargs))
+        acquires.extend(creates)
+        for entities, args, kwargs in acquires:
+            entities.acquire(*args, **kwargs)
+            applied += 1
+        return applied
+
+
+logger.debug("imported")
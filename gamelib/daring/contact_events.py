@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+import logging
+
+import numpy as np
+
+from gamelib.daring.puck_world import HANDLE_BITS, HANDLE_MASK
+
+logger = logging.getLogger(__name__)
+logger.debug("importing...")
+
+# contact events, in the order they are delivered each tick
+ENTER = 'enter'     # the pair touches this tick and didn't last tick
+STAY = 'stay'       # the pair touched last tick and still does
+EXIT = 'exit'       # the pair touched last tick and doesn't any more, or one of its bodies was removed
+EVENTS = (ENTER, STAY, EXIT)
+
+_EMPTY = np.zeros(0, dtype=np.int64)
+
+
+class ContactBatch:
+    __slots__ = ('event', 'first', 'second', 'ticks')
+
+    def __init__(self, event, first, second, ticks):
+        """every pair with the same event this tick, as parallel arrays
+
+        Args:
+            event: ENTER, STAY or EXIT
+            first: handles of the first body of each pair, see PuckWorld.handle()
+            second: handles of the second body, or the zone index for zone contacts
+            ticks: ticks each pair has been touching before this one; 0 on ENTER, the
+                contact's whole length on EXIT
+        """
+        self.event = event
+        self.first = first
+        self.second = second
+        self.ticks = ticks
+
+    def __len__(self):
+        return len(self.first)
+
+    @property
+    def first_slots(self):
+        """slots of the first bodies; on EXIT they may already be free or reused"""
+        return self.first & HANDLE_MASK
+
+    @property
+    def second_slots(self):
+        """slots of the second bodies; zone indices pass through unchanged"""
+        return self.second & HANDLE_MASK
+
+    def select(self, mask):
+        return ContactBatch(self.event, self.first[mask], self.second[mask], self.ticks[mask])
+
+
+class ContactEvents:
+
+    def __init__(self, bodies=True):
+        """turns each tick's contacts into enter, stay and exit events for subscribers
+
+        update() is given every pair touching this tick. Pairs are matched against the
+        cache kept from the tick before, so a consumer hears about a contact when it
+        begins, each tick it persists and once when it ends, and can keep the expensive
+        part of its reaction to the transitions. Pairs are keyed by slot and stamped with
+        the slots' generations, so a body removed mid contact ends it and whatever reuses
+        its slot starts a new one.
+
+        Subscribers get one ContactBatch per event per tick rather than a call per pair.
+        Nothing is tracked while nobody is subscribed.
+
+        Args:
+            bodies: True when both sides of a pair are bodies, as for the narrowphase;
+                False when the second is an index of something else, such as a zone
+        """
+        self.bodies = bodies
+        self.tick = 0
+        self._keys = _EMPTY         # first slot << HANDLE_BITS | second, sorted
+        self._generations = _EMPTY  # first generation << HANDLE_BITS | second generation (0 for non bodies)
+        self._since = _EMPTY        # tick each pair began touching
+        self._subscribers = []      # (callback, events) of subscribers to every pair
+        self._by_second = {}        # second -> [(callback, events)] of subscribers to one zone or body
+
+    def __len__(self):
+        """pairs touching as of the last update()"""
+        return len(self._keys)
+
+    def subscribe(self, callback, events=EVENTS, second=None):
+        """call callback(batch) with the pairs of each event in events, once per tick
+
+        Args:
+            callback: called with a ContactBatch, only when it has pairs
+            events: which of ENTER, STAY and EXIT to deliver
+            second: only deliver pairs whose second is this zone index (or body slot)
+        """
+        if second is None:
+            self._subscribers.append((callback, tuple(events)))
+        else:
+            self._by_second.setdefault(second, []).append((callback, tuple(events)))
+
+    def unsubscribe(self, callback):
+        self._subscribers = [entry for entry in self._subscribers if entry[0] != callback]
+        for second, entries in list(self._by_second.items()):
+            entries = [entry for entry in entries if entry[0] != callback]
+            if entries:
+                self._by_second[second] = entries
+            else:
+                del self._by_second[second]
+
+    def clear(self):
+        """forget every contact without sending exits, e.g. when the level is reset"""
+        self._keys = self._generations = self._since = _EMPTY
+
+    def update(self, world, first, second):
+        """match this tick's contacts against the last tick's and deliver the events
+
+        Args:
+            world: PuckWorld the bodies belong to
+            first: slots of the first body of each touching pair
+            second: slots of the second body, or zone indices; repeated pairs count once
+        """
+        if not self._subscribers and not self._by_second:
+            return
+        self.tick += 1
+        first = np.asarray(first, dtype=np.int64)
+        second = np.asarray(second, dtype=np.int64)
+        if self.bodies:
+            # a pair is the same whichever way round the narrowphase found it
+            first, second = np.minimum(first, second), np.maximum(first, second)
+            generations = world.generation[first].astype(np.int64) << HANDLE_BITS | world.generation[second]
+            first, second, generations = self._resting(world, first, second, generations)
+        else:
+            generations = world.generation[first].astype(np.int64) << HANDLE_BITS
+        keys, unique = np.unique(first << HANDLE_BITS | second, return_index=True)
+        generations = generations[unique]
+
+        # a pair carries on if the cache has the same slots with the same generations
+        old_keys = self._keys
+        if len(old_keys):
+            position = np.minimum(np.searchsorted(old_keys, keys), len(old_keys) - 1)
+            stayed = (old_keys[position] == keys) & (self._generations[position] == generations)
+        else:
+            position = np.zeros(len(keys), dtype=np.intp)
+            stayed = np.zeros(len(keys), dtype=bool)
+        since = np.full(len(keys), self.tick, dtype=np.int64)
+        since[stayed] = self._since[position[stayed]]
+        ended = np.ones(len(old_keys), dtype=bool)
+        ended[position[stayed]] = False
+
+        batches = (
+            self._batch(ENTER, keys[~stayed], generations[~stayed], since[~stayed], self.tick),
+            self._batch(STAY, keys[stayed], generations[stayed], since[stayed], self.tick),
+            self._batch(EXIT, old_keys[ended], self._generations[ended], self._since[ended], self.tick),
+        )
+        self._keys = keys
+        self._generations = generations
+        self._since = since
+        for batch in batches:
+            if len(batch):
+                self._deliver(batch)
+
+    def _resting(self, world, first, second, generations):
+        # Pairs of sleeping bodies aren't tested by the narrowphase, so they carry on as they were
+        old_keys = self._keys
+        if not len(old_keys):
+            return first, second, generations
+        old_first = old_keys >> HANDLE_BITS
+        old_second = old_keys & HANDLE_MASK
+        count = world.count
+        alive = (old_first < count) & (old_second < count)
+        old_first_alive = np.where(alive, old_first, 0)
+        old_second_alive = np.where(alive, old_second, 0)
+        resting = (alive & world.active[old_first_alive] & world.sleeping[old_first_alive] &
+                   world.active[old_second_alive] & world.sleeping[old_second_alive] &
+                   (world.generation[old_first_alive].astype(np.int64) << HANDLE_BITS |
+                    world.generation[old_second_alive] == self._generations))
+        if not resting.any():
+            return first, second, generations
+        return (np.concatenate((first, old_first[resting])), np.concatenate((second, old_second[resting])),
+                np.concatenate((generations, self._generations[resting])))
+
+    @staticmethod
+    def _batch(event, keys, generations, since, tick):
+        # handles are rebuilt from the slots in the key and the generations stamped on it
+        first = (generations >> HANDLE_BITS) << HANDLE_BITS | keys >> HANDLE_BITS
+        second = (generations & HANDLE_MASK) << HANDLE_BITS | keys & HANDLE_MASK
+        return ContactBatch(event, first, second, tick - since)
+
+    def _deliver(self, batch):
+        for callback, events in self._subscribers:
+            if batch.event in events:
+                callback(batch)
+        if self._by_second:
+            seconds = batch.second_slots
+            for second in np.unique(seconds):
+                for callback, events in self._by_second.get(int(second), ()):
+                    if batch.event in events:
+                        callback(batch.select(seconds == second))
+
+
+logger.debug("imported")
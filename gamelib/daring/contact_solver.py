@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+import logging
+
+import numpy as np
+
+from gamelib.daring.puck_world import HANDLE_BITS
+
+logger = logging.getLogger(__name__)
+logger.debug("importing...")
+
+
+class ContactSolver:
+
+    def __init__(self, iterations=8, restitution=0.8, slop=0.5, correction=0.4, warm_start=0.8,
+                 position_iterations=6):
+        """sequential impulse solver for the contacts between PuckWorld bodies
+
+        Contacts are collected with add() or add_many() while the pairs are tested, then solve() resolves
+        them all together: iterations Gauss-Seidel passes over the normal impulses, each
+        clamped so contacts only push, then position_iterations Gauss-Seidel passes of
+        positional correction. Each of those measures a contact's remaining penetration
+        from how far its bodies have already been pushed apart along the normal, so a
+        crowded pile is pulled back to within the slop in a few ticks. Accumulated
+        impulses are remembered per pair and applied up front next tick (warm starting), so
+        a resting stack starts close to its solution and settles instead of jittering. Pairs
+        are remembered by slot and stamped with the slots' generations, so a body spawned
+        into a freed slot starts from nothing.
+
+        Contacts are split into batches that share no body, so every batch is solved in one
+        vectorized pass and the result is the same as visiting them one by one.
+
+        Args:
+            iterations: Gauss-Seidel passes per solve
+            restitution: fraction of the approach speed a contact bounces back with
+            slop: penetration in pixels left uncorrected, so resting contacts stay touching
+            correction: fraction of the remaining penetration removed per position pass
+            warm_start: fraction of last tick's impulse applied up front, 0 disables
+            position_iterations: positional correction passes per solve
+        """
+        self.iterations = iterations
+        self.restitution = restitution
+        self.slop = slop
+        self.correction = correction
+        self.warm_start = warm_start
+        self.position_iterations = position_iterations
+        self._contacts = []     # (slot a, slot b, nx, ny, depth), normal from a towards b
+        self._batches = []      # (a, b, nx, ny, depth) arrays from add_many()
+        # accumulated normal impulses of the last solve, by slot a << HANDLE_BITS | slot b, sorted
+        self._keys = np.zeros(0, dtype=np.int64)
+        self._generations = np.zeros(0, dtype=np.int64)     # generation a << HANDLE_BITS | generation b
+        self._impulses = np.zeros(0)
+
+    def __len__(self):
+        return len(self._contacts) + sum(len(batch[0]) for batch in self._batches)
+
+    def add(self, slot_a, slot_b, nx, ny, depth):
+        """collect a contact; the normal points from a towards b"""
+        if slot_a > slot_b:
+            slot_a, slot_b, nx, ny = slot_b, slot_a, -nx, -ny
+        self._contacts.append((slot_a, slot_b, nx, ny, depth))
+
+    def add_many(self, a, b, nx, ny, depth):
+        """collect a contact per element of the given arrays; each normal points from a towards b"""
+        swap = a > b
+        self._batches.append((np.where(swap, b, a), np.where(swap, a, b), np.where(swap, -nx, nx),
+                              np.where(swap, -ny, ny), depth))
+
+    def clear(self):
+        self._contacts = []
+        self._batches = []
+        self._remember(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0))
+
+    def _remember(self, keys, generations, impulses):
+        order = np.argsort(keys, kind='stable')
+        self._keys = keys[order]
+        self._generations = generations[order]
+        self._impulses = impulses[order]
+
+    def solve(self, world):
+        """resolve every collected contact, updating the velocities and positions in world"""
+        collected = self._batches
+        if self._contacts:
+            collected.append(tuple(np.array(column) for column in zip(*self._contacts)))
+        self._contacts = []
+        self._batches = []
+        if not collected:
+            self.clear()
+            return
+        a, b, nx, ny, depth = (np.concatenate(column) for column in zip(*collected))
+        a = a.astype(np.intp)
+        b = b.astype(np.intp)
+        mass_a = world.mass[a]
+        mass_b = world.mass[b]
+        inv_a = np.where(mass_a > 0, 1.0 / np.where(mass_a > 0, mass_a, 1.0), 0.0)
+        inv_b = np.where(mass_b > 0, 1.0 / np.where(mass_b > 0, mass_b, 1.0), 0.0)
+        inv_sum = inv_a + inv_b
+        usable = inv_sum > 0
+        effective = np.where(usable, 1.0 / np.where(usable, inv_sum, 1.0), 0.0)
+        batches = _batches(a, b)
+        vx = world.vx
+        vy = world.vy
+
+        # bounce back from the approach speed measured before any impulse
+        approach = (vx[b] - vx[a]) * nx + (vy[b] - vy[a]) * ny
+        target = np.where(approach < 0, -self.restitution * approach, 0.0)
+
+        keys = a.astype(np.int64) << HANDLE_BITS | b
+        generations = world.generation[a].astype(np.int64) << HANDLE_BITS | world.generation[b]
+        impulse = np.zeros(len(a))
+        if self.warm_start and len(self._keys):
+            position = np.minimum(np.searchsorted(self._keys, keys), len(self._keys) - 1)
+            same = (self._keys[position] == keys) & (self._generations[position] == generations)
+            impulse = np.where(same, self._impulses[position], 0.0) * self.warm_start
+            for batch in batches:
+                _apply(world, a[batch], b[batch], nx[batch], ny[batch], impulse[batch], inv_a[batch], inv_b[batch])
+
+        for _ in range(self.iterations):
+            for batch in batches:
+                i, j = a[batch], b[batch]
+                normal_x = nx[batch]
+                normal_y = ny[batch]
+                speed = (vx[j] - vx[i]) * normal_x + (vy[j] - vy[i]) * normal_y
+                total = np.maximum(impulse[batch] + (target[batch] - speed) * effective[batch], 0.0)
+                delta = total - impulse[batch]
+                impulse[batch] = total
+                _apply(world, i, j, normal_x, normal_y, delta, inv_a[batch], inv_b[batch])
+
+        # push apart what is still overlapping beyond the slop, split by inverse mass
+        x = world.x
+        y = world.y
+        separation = (x[b] - x[a]) * nx + (y[b] - y[a]) * ny     # along the normal, grows as they part
+        for _ in range(self.position_iterations):
+            for batch in batches:
+                i, j = a[batch], b[batch]
+                normal_x = nx[batch]
+                normal_y = ny[batch]
+                parted = (x[j] - x[i]) * normal_x + (y[j] - y[i]) * normal_y - separation[batch]
+                push = self.correction * np.maximum(depth[batch] - parted - self.slop, 0.0) * effective[batch]
+                x[i] -= normal_x * push * inv_a[batch]
+                y[i] -= normal_y * push * inv_a[batch]
+                x[j] += normal_x * push * inv_b[batch]
+                y[j] += normal_y * push * inv_b[batch]
+
+        self._remember(keys, generations, impulse)
+
+
+def _apply(world, a, b, nx, ny, impulse, inv_a, inv_b):
+    world.vx[a] -= nx * impulse * inv_a
+    world.vy[a] -= ny * impulse * inv_a
+    world.vx[b] += nx * impulse * inv_b
+    world.vy[b] += ny * impulse * inv_b
+
+
+def _batches(a, b):
+    """split contacts into batches in which no body appears twice, keeping their order"""
+    batches = []
+    remaining = np.arange(len(a))
+    while len(remaining):
+        bodies = np.column_stack((a[remaining], b[remaining])).ravel()
+        first = np.zeros(len(bodies), dtype=bool)
+        first[np.unique(bodies, return_index=True)[1]] = True
+        # a contact joins this batch if it is the first to use both of its bodies
+        take = first[0::2] & first[1::2]
+        batches.append(remaining[take])
+        remaining = remaining[~take]
+    return batches
+
+
+logger.debug("imported")
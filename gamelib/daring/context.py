@@ -2,6 +2,8 @@
 import logging
 
 from gamelib.daring import run_stack
+from gamelib.daring.dirty_rects import DirtyRenderer
+from gamelib.daring.sprite_atlas import get_atlas
 
 logger = logging.getLogger(__name__)
 logger.debug("importing...")
@@ -10,7 +12,8 @@ logger.debug("importing...")
 class Context:
 
     def __init__(self, *args, **kwargs):
-        pass
+        self.renderer = DirtyRenderer()
+        self.sprites = get_atlas()
 
     def push(self, new_context):
         run_stack.push(new_context)
@@ -27,7 +30,9 @@ class Context:
     def update(self, dt):
         pass
 
-    def draw(self):
+    def draw(self, alpha):
+        # alpha: 0.0 - 1.0, how far real time is between the last update and the next;
+        # interpolate moving things by it for smooth rendering at any frame rate
         pass
 
 
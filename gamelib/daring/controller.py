@@ -4,7 +4,9 @@ import logging
 from gamelib.settings import Runtime, TimeSettings
 from gamelib.daring import run_stack
 from gamelib.daring.context import Context
-from gamelib.daring.timer import Timer, TimedItem
+from gamelib.daring.profiler import Profiler
+from gamelib.daring.timer import Timer
+from gamelib.daring.tracer import get_tracer
 
 logger = logging.getLogger(__name__)
 logger.debug("importing...")
@@ -12,31 +14,49 @@ logger.debug("importing...")
 
 def run(starting_context):
     run_stack.push(starting_context)
-    top_context: Context = starting_context
 
-    def update_callback(dt):
-        top_context.update(dt)
-
-    def draw_callback(dt):
-        top_context.draw()
-
-    timer = Timer()
-    # todo: ups and fps timings are decoupled; need to implement interpolated rendering
-    update_pulse = TimedItem(TimeSettings.ups, update_callback)
-    draw_pulse = TimedItem(TimeSettings.fps, draw_callback)
-    timer.add(update_pulse)
-    timer.add(draw_pulse)
+    step = 1000.0 / TimeSettings.ups    # milliseconds of game time per update
+    profiler = Runtime.profiler if Runtime.profiler else Profiler()
+    timers = Runtime.timer if Runtime.timer else Timer()
+    tracer = get_tracer()
+    accumulator = 0.0                   # milliseconds of real time not yet simulated
 
     # run as long as there is something on the run stack
     running = True
     while running:
-        top_context = run_stack.top()
+        top_context: Context = run_stack.top()
         if top_context:
             if TimeSettings.clock_nice:
-                Runtime.dt = Runtime.clock.tick(TimeSettings.ups)
+                Runtime.dt = Runtime.clock.tick(TimeSettings.fps)
             else:
-                Runtime.dt = Runtime.clock.tick_busy_loop(TimeSettings.ups)
-            timer.update()
+                Runtime.dt = Runtime.clock.tick_busy_loop(TimeSettings.fps)
+
+            profiler.begin_frame()
+
+            # wall clock timers fire once a frame, ahead of the fixed step updates
+            with profiler.scope('timers'):
+                timers.update()
+
+            # fixed step updates; a long stall is clamped so it can't queue up unbounded work
+            accumulator += min(Runtime.dt, TimeSettings.max_frame_time)
+            updates = 0
+            while accumulator >= step and updates < TimeSettings.max_updates:
+                with profiler.scope('update'), tracer.span('update', 'controller'):
+                    top_context.update(step)
+                accumulator -= step
+                updates += 1
+                if run_stack.top() is not top_context:
+                    break
+            if accumulator >= step and run_stack.top() is top_context:
+                # still behind after the catch-up budget; drop whole steps rather than spiral
+                logger.debug(f'dropped {int(accumulator // step)} updates')
+                accumulator %= step
+
+            # render between the last two updates
+            if run_stack.top() is top_context:
+                with profiler.scope('render'), tracer.span('draw', 'controller'):
+                    top_context.draw(accumulator / step)
+            profiler.end_frame()
         else:
             running = False
 
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+import collections
+import hashlib
+import logging
+import os
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+logger.debug("importing...")
+
+
+class SimClock:
+
+    def __init__(self, step_ms, pace=None):
+        """simulated time that advances by exactly step_ms per frame, for reproducible runs
+
+        Stands in for both pygame.time.Clock (tick()) and pygame.time.get_ticks (calling it).
+
+        Args:
+            step_ms: milliseconds per frame
+            pace: optional pygame.time.Clock; tick() also waits on it so a watched run
+                doesn't go faster than real time. Doesn't change the simulated time.
+        """
+        self.step_ms = step_ms
+        self.pace = pace
+        self.ticks = 0
+
+    def __call__(self):
+        return self.ticks
+
+    get_ticks = __call__
+
+    def tick(self, framerate=0):
+        """advance one frame and return its length in milliseconds, like pygame.time.Clock.tick"""
+        if self.pace is not None:
+            self.pace.tick(framerate)
+        self.ticks += self.step_ms
+        return self.step_ms
+
+
+def state_hash(world):
+    """blake2b digest of every slot of a PuckWorld; equal states give equal digests"""
+    n = world.count
+    h = hashlib.blake2b(digest_size=16)
+    h.update(np.int64(n).tobytes())
+    for name in world.columns:
+        h.update(getattr(world, name)[:n].tobytes())
+    h.update(world.active[:n].tobytes())
+    h.update(world.sleeping[:n].tobytes())
+    h.update(world.kind[:n].tobytes())
+    return h.hexdigest()
+
+
+# state hashes kept for save(), about 5MB of digests or 18 minutes at 60 ticks a second
+HASH_LIMIT = 1 << 16
+
+
+class TickHashes:
+
+    def __init__(self, reference=None, limit=HASH_LIMIT):
+        """records a state hash per tick and checks it against an earlier run
+
+        Only the last limit hashes are kept, so a long run doesn't grow without bound. Each
+        is checked against the reference as it is recorded, and saved files carry tick
+        numbers, so a reference trimmed this way still lines up.
+
+        Args:
+            reference: path of a file saved by an earlier run; if it exists, the first tick
+                whose hash differs is logged and kept in diverged_at
+            limit: most recent hashes kept for save()
+        """
+        self.tick = 0
+        self.hashes = collections.deque(maxlen=limit)
+        self.reference = None
+        self.diverged_at = None
+        if reference and os.path.exists(reference):
+            self.reference = self.load(reference)
+
+    def record(self, world):
+        digest = state_hash(world)
+        tick = self.tick
+        self.tick += 1
+        self.hashes.append(digest)
+        reference = self.reference
+        if reference is not None and self.diverged_at is None and reference.get(tick, digest) != digest:
+            self.diverged_at = tick
+            logger.error(f"state diverged from the reference run at tick {tick}")
+        return digest
+
+    def save(self, path):
+        """write the kept hashes, one "tick digest" line each"""
+        first = self.tick - len(self.hashes)
+        with open(path, 'w') as f:
+            for tick, digest in enumerate(self.hashes, first):
+                f.write(f"{tick} {digest}\n")
+
+    @staticmethod
+    def load(path):
+        """{tick: digest} from a file written by save()"""
+        with open(path) as f:
+            lines = (line.split() for line in f if line.strip())
+            return {int(tick): digest for tick, digest in lines}
+
+
+logger.debug("imported")
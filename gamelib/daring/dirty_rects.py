@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+import logging
+
+import pygame
+
+logger = logging.getLogger(__name__)
+logger.debug("importing...")
+
+
+class DirtyRenderer:
+
+    def __init__(self, full_redraw_ratio=0.4):
+        """presents only the parts of the display that changed since the last frame
+
+        Each frame:
+            if renderer.full_redraw: draw the background and set renderer.background to a copy
+            else: renderer.begin(surface) restores the background under last frame's drawing
+            draw the moving things, passing each one's bounds to renderer.draw(key, rect)
+            renderer.present()
+
+        Args:
+            full_redraw_ratio: when the dirty area passes this fraction of the display,
+                present() flips the whole display instead of updating rects
+        """
+        self.full_redraw_ratio = full_redraw_ratio
+        self.full_redraw = True     # the first frame always draws and presents everything
+        self._previous = {}         # key -> rect drawn last frame
+        self._current = {}          # key -> rect drawn this frame
+        self._dirty = []            # extra rects marked this frame
+        self.background = None      # surface holding everything that doesn't move
+
+    def invalidate(self):
+        """make the next frame a full redraw, e.g. after the background changed"""
+        self.full_redraw = True
+
+    def begin(self, surface):
+        """blit the background over everything drawn last frame and return those rects"""
+        if self.full_redraw:
+            return []
+        rects = list(self._previous.values())
+        if self.background is not None:
+            surface.blits([(self.background, rect, rect) for rect in rects], doreturn=False)
+        return rects
+
+    def draw(self, key, rect):
+        """record the bounds of a moving thing drawn this frame under a key stable across frames"""
+        rect = pygame.Rect(rect)
+        previous = self._current.get(key)
+        self._current[key] = previous.union(rect) if previous else rect
+
+    def dirty(self, rect):
+        """mark an area as changed this frame without tracking it across frames"""
+        self._dirty.append(pygame.Rect(rect))
+
+    def present(self):
+        if self.full_redraw:
+            pygame.display.flip()
+        else:
+            rects = list(self._dirty)
+            previous = self._previous
+            for key, rect in self._current.items():
+                old = previous.get(key)
+                if old is None:
+                    rects.append(rect)
+                elif old != rect:
+                    rects.append(old.union(rect))
+            for key, old in previous.items():
+                if key not in self._current:
+                    rects.append(old)
+            if rects:
+                width, height = pygame.display.get_surface().get_size()
+                area = sum(rect.width * rect.height for rect in rects)
+                if area > self.full_redraw_ratio * width * height:
+                    pygame.display.flip()
+                else:
+                    pygame.display.update(rects)
+        self.full_redraw = False
+        self._previous = self._current
+        self._current = {}
+        self._dirty = []
+
+
+logger.debug("imported")
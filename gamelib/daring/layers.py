@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+import logging
+
+logger = logging.getLogger(__name__)
+logger.debug("importing...")
+
+
+class LayerMatrix:
+
+    def __init__(self, pairs=()):
+        """which collision layers are tested against which
+
+        Layers are small ints handed out by add(), used as broadphase groups; see
+        SlotHash.pairs(layers), which checks a candidate pair against the matrix
+        with one bit test. Pairs of layers are reported in the order they were enabled,
+        (first, second), since some collision responses treat their two sides differently.
+
+        Args:
+            pairs: (first name, second name) pairs to enable, adding layers as they appear
+        """
+        self.names = []
+        self.masks = []         # per layer, bit i is set if it collides with layer i
+        self._swapped = set()   # (layer, layer) pairs reported the other way round
+        for first, second in pairs:
+            self.enable(self.layer(first), self.layer(second))
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, name):
+        """a new layer, colliding with nothing yet"""
+        if name in self.names:
+            raise ValueError(f"layer {name} already exists")
+        self.names.append(name)
+        self.masks.append(0)
+        return len(self.names) - 1
+
+    def layer(self, name):
+        """the layer called name, added if it doesn't exist"""
+        if name in self.names:
+            return self.names.index(name)
+        return self.add(name)
+
+    def enable(self, first, second):
+        """test first against second; pairs come out as (item of first, item of second)"""
+        self.masks[first] |= 1 << second
+        self.masks[second] |= 1 << first
+        self._swapped.discard((first, second))
+        if first != second:
+            self._swapped.add((second, first))
+
+    def disable(self, first, second):
+        self.masks[first] &= ~(1 << second)
+        self.masks[second] &= ~(1 << first)
+        self._swapped.discard((first, second))
+        self._swapped.discard((second, first))
+
+    def collides(self, first, second):
+        return bool(self.masks[first] >> second & 1)
+
+    def swapped(self, first, second):
+        """True if a pair from these layers is reported as (second, first)"""
+        return (first, second) in self._swapped
+
+    def enabled_pairs(self):
+        """every enabled pair, in the order it is reported"""
+        count = len(self.names)
+        return [(second, first) if self.swapped(first, second) else (first, second)
+                for first in range(count) for second in range(first, count) if self.collides(first, second)]
+
+
+logger.debug("imported")
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+import functools
+import logging
+
+import pygame
+
+from gamelib.daring.narrowphase import CIRCLE, AABB
+
+logger = logging.getLogger(__name__)
+logger.debug("importing...")
+
+# most recently used shapes kept; a level rarely has more distinct sizes than this
+CACHE_SIZE = 256
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def hitbox_surface(shape, width, height):
+    """the opaque hitbox of a shape on a transparent surface, shared by every caller
+
+    Args:
+        shape: narrowphase.CIRCLE (inscribed in width x height) or narrowphase.AABB
+        width, height: size of the surface
+
+    Returns:
+        pygame.Surface; shared, so don't draw on it
+    """
+    surface = pygame.Surface((width, height), pygame.SRCALPHA)
+    if shape == CIRCLE:
+        radius = min(width, height) // 2
+        pygame.draw.circle(surface, (0, 0, 0), (radius, radius), radius)
+    elif shape == AABB:
+        surface.fill((0, 0, 0))
+    else:
+        raise ValueError("no hitbox for shape {}".format(shape))
+    return surface
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def hitbox_mask(shape, width, height):
+    """the mask of hitbox_surface(shape, width, height); shared, so don't modify it"""
+    return pygame.mask.from_surface(hitbox_surface(shape, width, height))
+
+
+def circle_mask(radius):
+    return hitbox_mask(CIRCLE, radius * 2, radius * 2)
+
+
+def rect_mask(width, height):
+    return hitbox_mask(AABB, width, height)
+
+
+def clear():
+    hitbox_surface.cache_clear()
+    hitbox_mask.cache_clear()
+
+
+logger.debug("imported")
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+import logging
+import math
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+logger.debug("importing...")
+
+# shape names; geometry tuples for each shape are:
+#   CIRCLE: (x, y, radius)               center and radius
+#   AABB:   (left, top, right, bottom)   axis aligned box
+#   MASK:   (mask, x, y)                 pygame.mask.Mask with its top-left at x, y
+CIRCLE = 'circle'
+AABB = 'aabb'
+MASK = 'mask'
+
+
+# Each test returns None when the shapes are apart, else (nx, ny, depth): the unit normal
+# pointing from the first shape towards the second and the penetration depth along it.
+
+def circle_circle(a, b):
+    ax, ay, ar = a
+    bx, by, br = b
+    dx = bx - ax
+    dy = by - ay
+    reach = ar + br
+    distance_sq = dx * dx + dy * dy
+    if distance_sq >= reach * reach:
+        return None
+    distance = math.sqrt(distance_sq)
+    if distance == 0:
+        # coincident centers; separate along x rather than not at all
+        return 1.0, 0.0, reach
+    return dx / distance, dy / distance, reach - distance
+
+
+def circle_aabb(a, b):
+    cx, cy, radius = a
+    left, top, right, bottom = b
+    # closest point of the box to the circle center
+    px = min(max(cx, left), right)
+    py = min(max(cy, top), bottom)
+    dx = px - cx
+    dy = py - cy
+    distance_sq = dx * dx + dy * dy
+    if distance_sq > 0:
+        if distance_sq >= radius * radius:
+            return None
+        distance = math.sqrt(distance_sq)
+        return dx / distance, dy / distance, radius - distance
+    # center inside the box; leave through the nearest face
+    exits = (
+        (cx - left, 1.0, 0.0),
+        (right - cx, -1.0, 0.0),
+        (cy - top, 0.0, 1.0),
+        (bottom - cy, 0.0, -1.0),
+    )
+    depth, nx, ny = min(exits)
+    return nx, ny, depth + radius
+
+
+def aabb_aabb(a, b):
+    a_left, a_top, a_right, a_bottom = a
+    b_left, b_top, b_right, b_bottom = b
+    overlap_x = min(a_right, b_right) - max(a_left, b_left)
+    overlap_y = min(a_bottom, b_bottom) - max(a_top, b_top)
+    if overlap_x <= 0 or overlap_y <= 0:
+        return None
+    # resolve along the shortest axis
+    if overlap_x < overlap_y:
+        nx = 1.0 if a_left < b_left else -1.0
+        return nx, 0.0, overlap_x
+    ny = 1.0 if a_top < b_top else -1.0
+    return 0.0, ny, overlap_y
+
+
+def mask_mask(a, b):
+    a_mask, ax, ay = a
+    b_mask, bx, by = b
+    offset = (int(bx - ax), int(by - ay))
+    if not a_mask.overlap(b_mask, offset):
+        return None
+    # bitmaps have no analytic normal; use the direction between their centroids
+    a_cx, a_cy = a_mask.centroid()
+    b_cx, b_cy = b_mask.centroid()
+    dx = (bx + b_cx) - (ax + a_cx)
+    dy = (by + b_cy) - (ay + a_cy)
+    distance = math.sqrt(dx * dx + dy * dy)
+    if distance == 0:
+        return 1.0, 0.0, 0.0
+    return dx / distance, dy / distance, 0.0
+
+
+_tests = {
+    (CIRCLE, CIRCLE): circle_circle,
+    (CIRCLE, AABB): circle_aabb,
+    (AABB, AABB): aabb_aabb,
+    (MASK, MASK): mask_mask,
+}
+
+
+def collide(shape_a, geometry_a, shape_b, geometry_b):
+    """test two shapes for overlap
+
+    Args:
+        shape_a: CIRCLE, AABB or MASK
+        geometry_a: geometry tuple for shape_a
+        shape_b: CIRCLE, AABB or MASK
+        geometry_b: geometry tuple for shape_b
+
+    Returns:
+        None if apart, else (nx, ny, depth) with the normal pointing from a towards b.
+        MASK shapes can only be tested against other MASK shapes, and report a depth of 0.
+    """
+    test = _tests.get((shape_a, shape_b))
+    if test is not None:
+        return test(geometry_a, geometry_b)
+    test = _tests.get((shape_b, shape_a))
+    if test is None:
+        raise ValueError(f'no narrowphase test for {shape_a} and {shape_b}')
+    contact = test(geometry_b, geometry_a)
+    if contact is None:
+        return None
+    nx, ny, depth = contact
+    return -nx, -ny, depth
+
+
+def circles(ax, ay, ar, bx, by, br):
+    """circle_circle() for arrays of circle pairs, in one vectorized pass
+
+    Returns:
+        (hit, nx, ny, depth) arrays of the overlapping pairs: hit is the bool mask of pairs
+        that overlap, the others are only given for those pairs.
+    """
+    dx = bx - ax
+    dy = by - ay
+    reach = ar + br
+    distance_sq = dx * dx + dy * dy
+    hit = distance_sq < reach * reach
+    dx = dx[hit]
+    dy = dy[hit]
+    reach = reach[hit]
+    distance = np.sqrt(distance_sq[hit])
+    # coincident centers; separate along x rather than not at all
+    apart = distance > 0
+    safe = np.where(apart, distance, 1.0)
+    nx = np.where(apart, dx / safe, 1.0)
+    ny = np.where(apart, dy / safe, 0.0)
+    depth = np.where(apart, reach - distance, reach)
+    return hit, nx, ny, depth
+
+
+logger.debug("imported")
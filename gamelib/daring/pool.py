@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+import logging
+
+logger = logging.getLogger(__name__)
+logger.debug("importing...")
+
+
+class Pool:
+
+    def __init__(self, factory):
+        """recycles released objects instead of constructing new ones
+
+        Pooled objects provide spawn(*args, **kwargs), which brings a released object back
+        to the state factory(*args, **kwargs) would have built, and despawn(), which lets
+        go of whatever a live object holds.
+
+        Args:
+            factory: callable building a new live object, usually the class itself
+        """
+        self.factory = factory
+        self._free = []
+        self.created = 0        # objects the factory has built, for tuning prewarm sizes
+
+    def acquire(self, *args, **kwargs):
+        """a live object, recycled if one is free, else new"""
+        if self._free:
+            obj = self._free.pop()
+            obj.spawn(*args, **kwargs)
+            return obj
+        self.created += 1
+        return self.factory(*args, **kwargs)
+
+    def release(self, obj):
+        """despawn obj and keep it for the next acquire(); obj must not be used afterwards
+
+        When factory is a class, obj must be one of its instances; anything else would sit
+        in the pool unused while the pool it belongs to keeps building new ones.
+        """
+        if isinstance(self.factory, type) and not isinstance(obj, self.factory):
+            raise TypeError(f"{type(obj).__name__} released to a pool of {self.factory.__name__}")
+        obj.despawn()
+        self._free.append(obj)
+
+    def prewarm(self, size, *args, **kwargs):
+        """build objects up front until size are free, so later acquires don't allocate
+
+        Args:
+            size: number of free objects wanted
+            args, kwargs: passed to factory
+        """
+        while len(self._free) < size:
+            self.release(self.factory(*args, **kwargs))
+            self.created += 1
+
+    @property
+    def free(self):
+        return len(self._free)
+
+
+logger.debug("imported")
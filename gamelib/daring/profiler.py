@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+import collections
+import csv
+import json
+import logging
+import time
+
+import pygame
+
+logger = logging.getLogger(__name__)
+logger.debug("importing...")
+
+# scopes reported first and in this order; any other name is added after them when first used
+SCOPES = ('events', 'timers', 'broadphase', 'narrowphase', 'zones', 'spawners', 'integrate', 'render', 'flip')
+FRAME = 'frame'     # the whole frame, begin_frame() to end_frame()
+QUANTILES = (50, 95, 99)
+HISTORY = 3600      # frames kept for export by default, a minute at 60 fps
+
+
+class _NullScope:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+# handed out by every scope() call while disabled, so timing costs one method call
+_NULL_SCOPE = _NullScope()
+
+
+class _Scope:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.add(self.name, time.perf_counter_ns() - self.start)
+        return False
+
+
+class Profiler:
+
+    def __init__(self, enabled=False, window=240, history=HISTORY, budget_ms=None):
+        """times named scopes of every frame with perf_counter_ns
+
+        Each frame:
+            profiler.begin_frame()
+            with profiler.scope('broadphase'):
+                ...
+            profiler.end_frame()
+
+        A scope used more than once in a frame adds up. While disabled, scope() returns a
+        shared do-nothing context manager and the frame calls return at once.
+
+        Args:
+            enabled: bool, start timing right away
+            window: frames the rolling percentiles are taken over
+            history: the last frames kept for export; older ones are dropped so a long
+                session stays bounded. None keeps every frame
+            budget_ms: frame time drawn as a line on the overlay graph, e.g. 1000 / fps
+        """
+        self.enabled = enabled
+        self.window = window
+        self.budget_ms = budget_ms
+        self.names = list(SCOPES)
+        self.frame = 0                                      # frames ended so far
+        self.frames = collections.deque(maxlen=history)     # (frame, total ns, {name: ns})
+        self._recent = {name: collections.deque(maxlen=window) for name in self.names + [FRAME]}
+        self._current = {}          # name -> ns so far this frame
+        self._frame_start = None
+        self._font = None
+
+    def scope(self, name):
+        """context manager timing its block under name"""
+        if not self.enabled:
+            return _NULL_SCOPE
+        return _Scope(self, name)
+
+    def add(self, name, ns):
+        """add ns nanoseconds to name for the current frame"""
+        current = self._current
+        current[name] = current.get(name, 0) + ns
+
+    def begin_frame(self):
+        if self.enabled:
+            self._frame_start = time.perf_counter_ns()
+
+    def end_frame(self):
+        if not self.enabled or self._frame_start is None:
+            return
+        total = time.perf_counter_ns() - self._frame_start
+        current = self._current
+        for name in current:
+            if name not in self._recent:
+                self.names.append(name)
+                self._recent[name] = collections.deque(maxlen=self.window)
+        for name in self.names:
+            self._recent[name].append(current.get(name, 0))
+        self._recent[FRAME].append(total)
+        self.frames.append((self.frame, total, current))
+        self.frame += 1
+        self._current = {}
+        self._frame_start = None
+
+    def reset(self):
+        """forget every frame so far; also picks up a changed window"""
+        self.frame = 0
+        self.frames.clear()
+        self._recent = {name: collections.deque(maxlen=self.window) for name in self.names + [FRAME]}
+        self._current = {}
+        self._frame_start = None
+
+    def percentiles(self, name=FRAME, quantiles=QUANTILES):
+        """nearest rank percentiles of name over the last window frames, in milliseconds"""
+        samples = sorted(self._recent.get(name, ()))
+        if not samples:
+            return tuple(0.0 for _ in quantiles)
+        last = len(samples) - 1
+        return tuple(samples[min(last, max(0, -(-q * len(samples) // 100) - 1))] / 1e6 for q in quantiles)
+
+    def mean(self, name=FRAME):
+        """mean of name over the last window frames, in milliseconds"""
+        samples = self._recent.get(name)
+        return sum(samples) / len(samples) / 1e6 if samples else 0.0
+
+    def summary(self):
+        """{name: {'mean': ms, 'p50': ms, 'p95': ms, 'p99': ms}} for the frame and every scope"""
+        result = {}
+        for name in [FRAME] + self.names:
+            stats = {'mean': self.mean(name)}
+            stats.update(zip((f'p{q}' for q in QUANTILES), self.percentiles(name)))
+            result[name] = stats
+        return result
+
+    def draw(self, surface, topleft=(8, 8), graph_size=(240, 60)):
+        """draw the percentile table and a graph of recent frame times; returns the rect drawn
+
+        Args:
+            surface: pygame.Surface, drawn straight onto it
+            topleft: position of the panel
+            graph_size: (width, height) of the frame time graph, one pixel column per frame
+        """
+        if self._font is None:
+            self._font = pygame.font.Font(None, 18)
+        font = self._font
+        line_height = font.get_linesize()
+        rows = [('', 'p50', 'p95', 'p99')]
+        for name in [FRAME] + self.names:
+            rows.append((name,) + tuple(f'{ms:.2f}' for ms in self.percentiles(name)))
+        # the name column is left aligned, the numbers right aligned, whatever the font
+        name_width = max(font.size(row[0])[0] for row in rows) + 8
+        column_width = max(font.size(cell)[0] for row in rows for cell in row[1:]) + 8
+        graph_width, graph_height = graph_size
+        width = max(graph_width, name_width + column_width * 3) + 8
+        height = line_height * len(rows) + graph_height + 12
+        panel = pygame.Rect(topleft, (width, height))
+
+        surface.fill((0, 0, 0), panel)
+        y = panel.top + 4
+        for row in rows:
+            surface.blit(font.render(row[0], True, (220, 220, 220)), (panel.left + 4, y))
+            for i, cell in enumerate(row[1:], 1):
+                image = font.render(cell, True, (220, 220, 220))
+                surface.blit(image, (panel.left + 4 + name_width + column_width * i - image.get_width(), y))
+            y += line_height
+
+        # frame times, scaled so the worst of the window or twice the budget fits
+        graph = pygame.Rect(panel.left + 4, y + 4, graph_width, graph_height)
+        samples = list(self._recent[FRAME])[-graph_width:]
+        scale_ms = max([sample / 1e6 for sample in samples] + [2 * (self.budget_ms or 0), 1.0])
+        for i, sample in enumerate(samples):
+            bar = min(graph_height, int(sample / 1e6 / scale_ms * graph_height))
+            over = self.budget_ms is not None and sample / 1e6 > self.budget_ms
+            x = graph.left + i
+            pygame.draw.line(surface, (220, 60, 60) if over else (60, 200, 120), (x, graph.bottom - 1),
+                             (x, graph.bottom - 1 - bar))
+        if self.budget_ms:
+            y = graph.bottom - 1 - int(self.budget_ms / scale_ms * graph_height)
+            pygame.draw.line(surface, (220, 220, 60), (graph.left, y), (graph.right - 1, y))
+        return panel
+
+    def export_csv(self, path):
+        """one row per kept frame: frame, frame_ms and a column per scope in milliseconds"""
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['frame', 'frame_ms'] + [f'{name}_ms' for name in self.names])
+            for frame, total, scopes in self.frames:
+                writer.writerow([frame, total / 1e6] + [scopes.get(name, 0) / 1e6 for name in self.names])
+
+    def export_json(self, path):
+        """the summary plus the kept frames, times in milliseconds"""
+        frames = [{'frame': frame, 'frame_ms': total / 1e6,
+                   'scopes': {name: ns / 1e6 for name, ns in scopes.items()}}
+                  for frame, total, scopes in self.frames]
+        with open(path, 'w') as f:
+            json.dump({'scopes': self.names, 'summary': self.summary(), 'frames': frames}, f, indent=1)
+
+    def export(self, path):
+        """export_json() for a .json path, export_csv() for anything else"""
+        if path.lower().endswith('.json'):
+            self.export_json(path)
+        else:
+            self.export_csv(path)
+        logger.debug(f'exported {len(self.frames)} profiled frames to {path}')
+
+
+logger.debug("imported")
@@ -0,0 +1,597 @@
+# -*- coding: utf-8 -*-
+import logging
+
+import numpy as np
+
+from gamelib.daring import ccd
+
+logger = logging.getLogger(__name__)
+logger.debug("importing...")
+
+# body kinds; KIND_NONE marks a free slot
+KIND_NONE = 0
+KIND_PUCK = 1
+KIND_STATIC = 2
+KIND_SHOOTER = 3
+KIND_ICE = 4
+KIND_COUNT = 5
+
+# what happens to a body that drops below its kind's rest speed
+REST_NONE = 0           # nothing
+REST_STOP = 1           # velocity is zeroed, body stays active
+REST_DEACTIVATE = 2     # body goes inactive
+
+# handles are the slot in the low bits and the slot's generation above them
+HANDLE_BITS = 32
+HANDLE_MASK = (1 << HANDLE_BITS) - 1
+
+
+class PuckWorld:
+
+    columns = ('x', 'y', 'vx', 'vy', 'mass', 'radius', 'collision_radius', 'width', 'height', 'rest_time')
+    # sizes are whole or half pixels set once per spawn, exact in float32; arithmetic with
+    # the float64 columns still happens in float64
+    dtypes = {'radius': np.float32, 'collision_radius': np.float32, 'width': np.float32, 'height': np.float32}
+
+    def __init__(self, bounds, capacity=256, motion_limit=1.0, contact_slop=0.5, spatial_hash=None):
+        """structure-of-arrays store for every moving body in a level
+
+        Each body owns one slot in a set of contiguous arrays. step() integrates all of
+        them in one vectorized pass, so per-body Python cost only remains for code that
+        touches bodies through their PuckView.
+
+        Circles moving further than motion_limit times their collision radius in one step
+        are swept instead of jumped: their step ends at the first time of impact with
+        another circle or with anything in sweep_tests, and walls reflect them exactly.
+        Only those few bodies pay for it.
+
+        Bodies of kinds with a sleep_after fall asleep once they and every body they touch,
+        their island, have been slower than their rest speed that long. Sleeping bodies are
+        skipped by step() until something sets them moving or an awake body touches them,
+        which wakes the whole island. Contacts are reported with touch().
+
+        query_circle(), query_rect() and query_annulus() find the bodies in an area and
+        return their handles. Candidates come from the cells of spatial_hash, the same grid
+        the collision pairs come from, so there is one index to keep up to date; a body is
+        found once it has been filed there. Without a spatial_hash every active body is a
+        candidate.
+
+        Args:
+            bounds: (left, top, right, bottom) walls the bodies bounce off
+            capacity: initial number of slots; grows by doubling when full
+            motion_limit: per step motion, in collision radii, above which a body is swept
+            contact_slop: pixels swept circles are allowed to sink into each other, so
+                the collision that stopped them is still overlapping next tick
+            spatial_hash: spatial_hash.SlotHash filing this world's slots, e.g. the engine's
+                broadphase; may also be set later
+        """
+        self.bounds = bounds
+        self.capacity = capacity
+        self.motion_limit = motion_limit
+        self.contact_slop = contact_slop
+        self.spatial_hash = spatial_hash
+        # callables sweep(world, slots, dx, dy) returning, per swept body, the fraction of
+        # its motion it may travel this step; e.g. ZoneEffects.sweep
+        self.sweep_tests = []
+        self.count = 0                  # slots in use are all below count
+        self._free = []                 # released slots below count, reused first
+        for name in self.columns:
+            setattr(self, name, np.zeros(capacity, dtype=self.dtypes.get(name, np.float64)))
+        self.active = np.zeros(capacity, dtype=bool)
+        self.sleeping = np.zeros(capacity, dtype=bool)
+        self.island = np.full(capacity, -1, dtype=np.int32)    # sleeping island label, -1 when awake
+        self.kind = np.zeros(capacity, dtype=np.int8)
+        self.generation = np.zeros(capacity, dtype=np.uint32)   # bumped whenever a slot is freed
+        self.owners = [None] * capacity     # view bound to each slot
+        self._contacts = []                 # (slot, slot) pairs touching this tick
+        self._touched = []                  # (n, 2) arrays of pairs from touch_many() this tick
+
+        # per kind tables, indexed by kind
+        self.damping = np.ones(KIND_COUNT)
+        self.rest_speed = np.zeros(KIND_COUNT)
+        self.rest_action = np.zeros(KIND_COUNT, dtype=np.int8)
+        self.sleep_after = np.zeros(KIND_COUNT)     # 0 never sleeps
+
+    def set_kind(self, kind, damping=1.0, rest_speed=0.0, rest_action=REST_NONE, sleep_after=0.0):
+        self.damping[kind] = damping
+        self.rest_speed[kind] = rest_speed
+        self.rest_action[kind] = rest_action
+        self.sleep_after[kind] = sleep_after
+
+    def add(self, kind, owner=None):
+        """claim a zeroed, active slot for a body of the given kind and return it"""
+        if self._free:
+            slot = self._free.pop()
+        else:
+            if self.count == self.capacity:
+                self._grow()
+            slot = self.count
+            self.count += 1
+        self.kind[slot] = kind
+        self.active[slot] = True
+        self.owners[slot] = owner
+        return slot
+
+    def remove(self, slot):
+        for name in self.columns:
+            getattr(self, name)[slot] = 0.0
+        self.active[slot] = False
+        self.sleeping[slot] = False
+        self.island[slot] = -1
+        self.kind[slot] = KIND_NONE
+        self.generation[slot] += 1
+        self.owners[slot] = None
+        self._free.append(slot)
+
+    def _grow(self):
+        extra = self.capacity
+        for name in self.columns:
+            column = getattr(self, name)
+            setattr(self, name, np.concatenate((column, np.zeros(extra, dtype=column.dtype))))
+        self.active = np.concatenate((self.active, np.zeros(extra, dtype=bool)))
+        self.sleeping = np.concatenate((self.sleeping, np.zeros(extra, dtype=bool)))
+        self.island = np.concatenate((self.island, np.full(extra, -1, dtype=np.int32)))
+        self.kind = np.concatenate((self.kind, np.zeros(extra, dtype=np.int8)))
+        self.generation = np.concatenate((self.generation, np.zeros(extra, dtype=np.uint32)))
+        self.owners.extend([None] * extra)
+        self.capacity += extra
+
+    def handle(self, slot):
+        """an int naming the body in slot; it stops resolving once that body is removed"""
+        return int(self.generation[slot]) << HANDLE_BITS | int(slot)
+
+    def resolve(self, handle):
+        """the slot a handle names, or None if its body has been removed"""
+        slot = handle & HANDLE_MASK
+        if slot < self.count and self.kind[slot] != KIND_NONE and self.generation[slot] == handle >> HANDLE_BITS:
+            return slot
+        return None
+
+    def handles(self, slots):
+        """handle() of every slot in an array"""
+        slots = np.asarray(slots, dtype=np.int64)
+        return self.generation[slots].astype(np.int64) << HANDLE_BITS | slots
+
+    def resolve_all(self, handles):
+        """slots of the handles in an array that still name a body, in the same order"""
+        handles = np.asarray(handles, dtype=np.int64)
+        slots = handles & HANDLE_MASK
+        known = slots < self.count
+        slots = slots[known]
+        generations = handles[known] >> HANDLE_BITS & HANDLE_MASK
+        return slots[(self.kind[slots] != KIND_NONE) & (self.generation[slots] == generations)]
+
+    def _extent(self, slots):
+        """radius of a circle around each body: its collision radius, or a box's half diagonal"""
+        width = self.width[slots]
+        return np.where(width > 0, np.hypot(width, self.height[slots]) * 0.5, self.collision_radius[slots])
+
+    def collision_bounds(self, slots):
+        """left, top, right and bottom arrays bounding each body, circles by collision radius"""
+        x = self.x[slots]
+        y = self.y[slots]
+        width = self.width[slots]
+        box = width > 0
+        collision_radius = self.collision_radius[slots]
+        half_width = np.where(box, width * 0.5, collision_radius)
+        half_height = np.where(box, self.height[slots] * 0.5, collision_radius)
+        return x - half_width, y - half_height, x + half_width, y + half_height
+
+    def _candidates(self, left, top, right, bottom, kinds):
+        """active slots in ascending order, optionally of the given kinds, filed in cells near the rectangle"""
+        grid = self.spatial_hash
+        if grid is None:
+            found = self.live_slots()
+        else:
+            # the grid is synced once a tick, look a cell further out for bodies moved since;
+            # slots freed since then are still filed
+            margin = grid.cell_size
+            found = grid.query(left - margin, top - margin, right + margin, bottom + margin)
+            found = found[found < self.count]
+        keep = self.active[found]
+        if kinds is not None:
+            keep &= np.isin(self.kind[found], kinds)
+        return found[keep]
+
+    def query_circle(self, x, y, radius, kinds=None):
+        """handles, in ascending slot order, of the active bodies overlapping a circle
+
+        Circles overlap when their centers are closer than the sum of the radii; boxes
+        when their closest point is closer than radius.
+
+        Args:
+            x, y, radius: the circle
+            kinds: optional sequence of kinds to keep
+        """
+        slots = self._candidates(x - radius, y - radius, x + radius, y + radius, kinds)
+        bx = self.x[slots]
+        by = self.y[slots]
+        half_width = self.width[slots] * 0.5
+        half_height = self.height[slots] * 0.5
+        box = half_width > 0
+        # distance to the box's closest point, or to the circle's center
+        dx = np.where(box, np.maximum(np.abs(bx - x) - half_width, 0.0), bx - x)
+        dy = np.where(box, np.maximum(np.abs(by - y) - half_height, 0.0), by - y)
+        reach = np.where(box, radius, radius + self.collision_radius[slots])
+        return self.handles(slots[dx * dx + dy * dy < reach * reach])
+
+    def query_rect(self, left, top, right, bottom, kinds=None):
+        """handles, in ascending slot order, of the active bodies overlapping a rectangle"""
+        slots = self._candidates(left, top, right, bottom, kinds)
+        bx = self.x[slots]
+        by = self.y[slots]
+        half_width = self.width[slots] * 0.5
+        half_height = self.height[slots] * 0.5
+        box = half_width > 0
+        radius = self.collision_radius[slots]
+        # circles: the rectangle's point closest to the center is within the radius
+        dx = bx - np.clip(bx, left, right)
+        dy = by - np.clip(by, top, bottom)
+        circle_hit = dx * dx + dy * dy < radius * radius
+        box_hit = ((bx - half_width < right) & (bx + half_width > left) &
+                   (by - half_height < bottom) & (by + half_height > top))
+        return self.handles(slots[np.where(box, box_hit, circle_hit)])
+
+    def query_annulus(self, x, y, inner, outer, kinds=None):
+        """handles, in ascending slot order, of the active bodies overlapping a ring, e.g. a shockwave front
+
+        A body overlaps when some of it lies between inner and outer from (x, y); boxes are
+        treated as the circle around them.
+        """
+        slots = self._candidates(x - outer, y - outer, x + outer, y + outer, kinds)
+        distance = np.hypot(self.x[slots] - x, self.y[slots] - y)
+        extent = self._extent(slots)
+        return self.handles(slots[(distance - extent < outer) & (distance + extent > inner)])
+
+    def live_slots(self, kind=None):
+        """indices of active slots, optionally only those of one kind"""
+        n = self.count
+        live = self.active[:n]
+        if kind is not None:
+            live = live & (self.kind[:n] == kind)
+        return np.flatnonzero(live)
+
+    def dead_slots(self, kind=None):
+        """indices of slots still claimed but gone inactive, e.g. killed by a zone"""
+        n = self.count
+        dead = ~self.active[:n] & (self.kind[:n] != KIND_NONE)
+        if kind is not None:
+            dead &= self.kind[:n] == kind
+        return np.flatnonzero(dead)
+
+    def awake_slots(self):
+        """indices of active slots that aren't sleeping"""
+        n = self.count
+        return np.flatnonzero(self.active[:n] & ~self.sleeping[:n])
+
+    def touch(self, slot_a, slot_b):
+        """report that two bodies are in contact this tick"""
+        self._contacts.append((slot_a, slot_b))
+
+    def touch_many(self, a, b):
+        """touch() each pair of slots in two arrays"""
+        self._touched.append(np.column_stack((a, b)).astype(np.intp))
+
+    def contacts(self):
+        """(slot, slot) pairs reported by touch() and touch_many() so far this tick, as an (n, 2) array"""
+        return np.concatenate(self._touched + [np.array(self._contacts, dtype=np.intp).reshape(-1, 2)])
+
+    def wake(self, slots):
+        """wake the given bodies and everything sleeping on the same islands"""
+        slots = np.asarray(slots, dtype=np.intp)
+        n = self.count
+        islands = self.island[slots]
+        waking = np.isin(self.island[:n], islands[islands >= 0])
+        waking[slots] = True
+        waking &= self.sleeping[:n]
+        self.sleeping[:n][waking] = False
+        self.island[:n][waking] = -1
+        self.rest_time[:n][waking] = 0.0
+
+    def slower_than(self, kind, speed):
+        """active slots of the given kind moving slower than speed"""
+        slots = self.live_slots(kind)
+        return slots[np.hypot(self.vx[slots], self.vy[slots]) < speed]
+
+    def step(self, dt):
+        """damp, move, bounce off the walls and apply the rest and sleep rules for every awake body"""
+        contacts = self.contacts()
+        self._contacts = []
+        self._touched = []
+        self._wake_disturbed(contacts)
+        slots = self.awake_slots()
+        if not len(slots):
+            return
+        kind = self.kind[slots]
+        damping = self.damping[kind]
+        vx = self.vx[slots] * damping
+        vy = self.vy[slots] * damping
+        dx = vx * dt
+        dy = vy * dt
+
+        collision_radius = self.collision_radius[slots]
+        fast = np.flatnonzero((collision_radius > 0) & (np.hypot(dx, dy) > self.motion_limit * collision_radius))
+        if len(fast):
+            fraction = self._sweep(slots, fast, dx, dy)
+            dx *= fraction
+            dy *= fraction
+        x = self.x[slots] + dx
+        y = self.y[slots] + dy
+
+        # circles bounce on their radius, boxes on half their width and height
+        width = self.width[slots]
+        height = self.height[slots]
+        radius = self.radius[slots]
+        half_width = np.where(width > 0, width * 0.5, radius)
+        half_height = np.where(height > 0, height * 0.5, radius)
+        left, top, right, bottom = self.bounds
+        bounce_x = ((x - half_width < left) & (vx < 0)) | ((x + half_width > right) & (vx > 0))
+        bounce_y = ((y - half_height < top) & (vy < 0)) | ((y + half_height > bottom) & (vy > 0))
+        if len(fast):
+            # swept bodies can overshoot a wall by more than their size, mirror them back in
+            x[fast] = _reflect(x[fast], left + half_width[fast], right - half_width[fast])
+            y[fast] = _reflect(y[fast], top + half_height[fast], bottom - half_height[fast])
+        vx = np.where(bounce_x, -vx, vx)
+        vy = np.where(bounce_y, -vy, vy)
+
+        resting = np.hypot(vx, vy) < self.rest_speed[kind]
+        action = self.rest_action[kind]
+        stop = resting & (action == REST_STOP)
+        vx[stop] = 0.0
+        vy[stop] = 0.0
+
+        self.x[slots] = x
+        self.y[slots] = y
+        self.vx[slots] = vx
+        self.vy[slots] = vy
+        self.active[slots[resting & (action == REST_DEACTIVATE)]] = False
+
+        sleep_after = self.sleep_after[kind]
+        still = resting & (sleep_after > 0)
+        rest_time = np.where(still, self.rest_time[slots] + dt, 0.0)
+        self.rest_time[slots] = rest_time
+        self._sleep_islands(slots, still & (rest_time >= sleep_after), contacts)
+
+    def _wake_disturbed(self, contacts):
+        """wake sleeping bodies that were set moving or touched by an awake body since the last step"""
+        n = self.count
+        sleeping = self.sleeping[:n]
+        if not sleeping.any():
+            return
+        disturbed = sleeping & self.active[:n] & ((self.vx[:n] != 0) | (self.vy[:n] != 0))
+        if len(contacts):
+            a, b = contacts[:, 0], contacts[:, 1]
+            disturbed[a[sleeping[a] & ~sleeping[b]]] = True
+            disturbed[b[sleeping[b] & ~sleeping[a]]] = True
+        if disturbed.any():
+            self.wake(np.flatnonzero(disturbed))
+
+    def _sleep_islands(self, slots, ready, contacts):
+        """put to sleep every island of touching bodies whose members are all ready to sleep
+
+        Args:
+            slots: the bodies stepped this tick
+            ready: per slot, whether that body alone could sleep
+            contacts: (slot, slot) pairs touching this tick
+        """
+        if not ready.any():
+            return
+        # label islands by propagating the smallest slot index across contacts
+        labels = np.arange(self.count)
+        if len(contacts):
+            a, b = contacts[:, 0], contacts[:, 1]
+            while True:
+                low = np.minimum(labels[a], labels[b])
+                changed = (labels[a] != low) | (labels[b] != low)
+                if not changed.any():
+                    break
+                np.minimum.at(labels, a, low)
+                np.minimum.at(labels, b, low)
+                labels = labels[labels]
+        island = labels[slots]
+        # an island sleeps only if none of its members still moves
+        restless = np.unique(island[~ready])
+        sleepers = slots[ready & ~np.isin(island, restless)]
+        self.sleeping[sleepers] = True
+        self.island[sleepers] = labels[sleepers]
+        self.vx[sleepers] = 0.0
+        self.vy[sleepers] = 0.0
+
+    def _sweep(self, slots, fast, dx, dy):
+        """fraction of its motion each body travels this step, cut short at the first impact of a fast one
+
+        Args:
+            slots: the bodies being stepped
+            fast: indices into slots of the bodies to sweep
+            dx, dy: motion of every body in slots this step
+        """
+        fraction = np.ones(len(slots))
+        x = self.x[slots]
+        y = self.y[slots]
+        collision_radius = self.collision_radius[slots]
+        circles = np.flatnonzero(collision_radius > 0)
+        n = self.count
+        sleepers = np.flatnonzero(self.active[:n] & self.sleeping[:n] & (self.collision_radius[:n] > 0))
+        for i in fast:
+            others = circles[circles != i]
+            t = ccd.circle_circle_toi(x[i], y[i], dx[i], dy[i], x[others], y[others], dx[others], dy[others],
+                                      collision_radius[i] + collision_radius[others] - self.contact_slop)
+            if len(t):
+                first = np.argmin(t)
+                if t[first] < fraction[i]:
+                    # both stop at the impact, so they are touching when the collision is resolved
+                    fraction[i] = t[first]
+                    fraction[others[first]] = min(fraction[others[first]], t[first])
+            if len(sleepers):
+                # sleeping bodies don't move, and wake when the collision is reported
+                t = ccd.circle_circle_toi(x[i], y[i], dx[i], dy[i], self.x[sleepers], self.y[sleepers], 0.0, 0.0,
+                                          collision_radius[i] + self.collision_radius[sleepers] - self.contact_slop)
+                fraction[i] = min(fraction[i], t.min())
+        for sweep in self.sweep_tests:
+            fraction[fast] = np.minimum(fraction[fast], sweep(self, slots[fast], dx[fast], dy[fast]))
+        return fraction
+
+
+def _reflect(position, low, high):
+    """mirror positions that passed low or high back inside, as a bounce off that wall would"""
+    position = np.where(position < low, 2 * low - position, position)
+    return np.where(position > high, 2 * high - position, position)
+
+
+class SlotSet:
+
+    def __init__(self, world):
+        """set of PuckWorld bodies kept as one bit per slot
+
+        The bits are packed into 64 bit words, and each slot also keeps the generation it
+        was added with. Membership is stamped with that generation, so a body that is
+        removed drops out of every set on its own and whatever reuses the slot starts
+        outside them. Memory is fixed by the world's capacity however many bodies come and go.
+
+        Args:
+            world: PuckWorld whose slots are stored
+        """
+        self.world = world
+        self._bits = np.zeros(_words(world.capacity), dtype=_WORD)
+        self._generation = np.zeros(world.capacity, dtype=np.uint32)
+
+    def _fit(self):
+        extra = _words(self.world.capacity) - len(self._bits)
+        if extra > 0:
+            self._bits = np.concatenate((self._bits, np.zeros(extra, dtype=_WORD)))
+        extra = self.world.capacity - len(self._generation)
+        if extra > 0:
+            self._generation = np.concatenate((self._generation, np.zeros(extra, dtype=np.uint32)))
+
+    def add(self, slots):
+        """add a slot or an array of slots"""
+        self._fit()
+        slots = np.atleast_1d(np.asarray(slots, dtype=np.int64))
+        np.bitwise_or.at(self._bits, slots >> 6, _bit(slots))
+        self._generation[slots] = self.world.generation[slots]
+
+    def discard(self, slots):
+        self._fit()
+        slots = np.atleast_1d(np.asarray(slots, dtype=np.int64))
+        np.bitwise_and.at(self._bits, slots >> 6, ~_bit(slots))
+
+    def __contains__(self, slot):
+        return (slot < len(self._generation) and int(self._bits[slot >> 6]) >> (slot & 63) & 1 == 1
+                and self._generation[slot] == self.world.generation[slot])
+
+    def slots(self):
+        """member slots in ascending order"""
+        self._fit()
+        n = self.world.count
+        members = np.unpackbits(self._bits.view(np.uint8), count=n, bitorder='little').astype(bool)
+        valid = members & (self._generation[:n] == self.world.generation[:n])
+        if not np.array_equal(valid, members):
+            # forget removed bodies while we're here
+            unpacked = np.zeros(len(self._bits) * 64, dtype=bool)
+            unpacked[:n] = valid
+            self._bits = np.packbits(unpacked, bitorder='little').view(_WORD)
+        return np.flatnonzero(valid)
+
+    def __len__(self):
+        return len(self.slots())
+
+    def clear(self):
+        self._bits[:] = 0
+
+
+# SlotSet bits, little endian so the bytes unpack in slot order
+_WORD = np.dtype('<u8')
+
+
+def _words(capacity):
+    return (capacity + 63) // 64
+
+
+def _bit(slots):
+    return np.left_shift(np.uint64(1), (slots & 63).astype(np.uint64))
+
+
+class _Column:
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, view, owner=None):
+        if view is None:
+            return self
+        # item() hands back a Python float or bool without building a numpy scalar first
+        return getattr(view.world, self.name).item(view.slot)
+
+    def __set__(self, view, value):
+        getattr(view.world, self.name)[view.slot] = value
+
+
+class PuckView:
+    """attribute access to one PuckWorld slot, so level scripts can keep using puck.x etc.
+
+    Subclasses set kind and call attach() before assigning any column attribute.
+    """
+
+    __slots__ = ('world', 'slot')
+
+    kind = KIND_PUCK
+
+    mass = _Column('mass')
+    radius = _Column('radius')
+    collision_radius = _Column('collision_radius')
+    width = _Column('width')
+    height = _Column('height')
+    active = _Column('active')
+    sleeping = _Column('sleeping')
+
+    # position and velocity are read and written most, so they skip the generic column lookup
+
+    @property
+    def x(self):
+        return self.world.x.item(self.slot)
+
+    @x.setter
+    def x(self, value):
+        self.world.x[self.slot] = value
+
+    @property
+    def y(self):
+        return self.world.y.item(self.slot)
+
+    @y.setter
+    def y(self, value):
+        self.world.y[self.slot] = value
+
+    @property
+    def vx(self):
+        return self.world.vx.item(self.slot)
+
+    @vx.setter
+    def vx(self, value):
+        self.world.vx[self.slot] = value
+
+    @property
+    def vy(self):
+        return self.world.vy.item(self.slot)
+
+    @vy.setter
+    def vy(self, value):
+        self.world.vy[self.slot] = value
+
+    @property
+    def handle(self):
+        return self.world.handle(self.slot)
+
+    def attach(self, world):
+        self.world = world
+        self.slot = world.add(self.kind, self)
+
+    def detach(self):
+        """give the slot back to the world; the view must not be used afterwards"""
+        if self.slot is not None:
+            self.world.remove(self.slot)
+            self.slot = None
+
+
+logger.debug("imported")
@@ -1,10 +1,13 @@
 # -*- coding: utf-8 -*-
 import logging
 
+from gamelib.daring.tracer import get_tracer
+
 logger = logging.getLogger(__name__)
 logger.debug("importing...")
 
 _run_stack = []
+_tracer = get_tracer()
 
 
 def top():
@@ -13,11 +16,13 @@ def top():
 
 
 def push(context):
+    _tracer.instant('push', 'run_stack', {'context': type(context).__name__})
     _run_stack.append(context)
 
 
 def pop():
-    _run_stack.pop(-1)
+    context = _run_stack.pop(-1)
+    _tracer.instant('pop', 'run_stack', {'context': type(context).__name__})
 
 
 def clear():
@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+logger.debug("importing...")
+
+# SlotHash cell keys are column * CELL_STRIDE + row, so the cells of one column are one key range
+CELL_STRIDE = 1 << 20
+
+_EMPTY = np.zeros(0, dtype=np.int64)
+
+
+class SpatialHash:
+
+    def __init__(self, cell_size):
+        """uniform grid broadphase; items are bucketed by the cells their bounds overlap
+
+        Items are kept between ticks. update() only touches the grid when an item's
+        cell range changes, so slow or resting items cost a dict lookup per tick.
+
+        Resting items stay in the grid but are left out of the dynamic set: pairs() skips
+        cells holding only resting items and never pairs two resting items.
+
+        Args:
+            cell_size: width and height of a grid cell in pixels
+        """
+        self.cell_size = cell_size
+        self._cells = {}        # (cx, cy) -> {item: None}; dicts keep insertion order
+        self._items = {}        # item -> (cx0, cy0, cx1, cy1, group, resting)
+        self._awake = {}        # (cx, cy) -> number of items in the cell that aren't resting
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, item):
+        return item in self._items
+
+    def cell_range(self, left, top, right, bottom):
+        size = self.cell_size
+        return int(left // size), int(top // size), int(right // size), int(bottom // size)
+
+    def update(self, item, left, top, right, bottom, group=None, resting=False):
+        """insert item or move it to the cells covered by the given bounds"""
+        cx0, cy0, cx1, cy1 = self.cell_range(left, top, right, bottom)
+        entry = self._items.get(item)
+        if entry is not None:
+            if entry[:4] == (cx0, cy0, cx1, cy1) and entry[5] == resting:
+                if entry[4] != group:
+                    self._items[item] = (cx0, cy0, cx1, cy1, group, resting)
+                return
+            self._unlink(item, entry)
+        cells = self._cells
+        awake = self._awake
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                cell = cells.get((cx, cy))
+                if cell is None:
+                    cells[cx, cy] = {item: None}
+                else:
+                    cell[item] = None
+                if not resting:
+                    awake[cx, cy] = awake.get((cx, cy), 0) + 1
+        self._items[item] = (cx0, cy0, cx1, cy1, group, resting)
+
+    def is_resting(self, item):
+        entry = self._items.get(item)
+        return entry is not None and entry[5]
+
+    def remove(self, item):
+        entry = self._items.pop(item, None)
+        if entry is not None:
+            self._unlink(item, entry)
+
+    def retain(self, items):
+        """remove every item not in items"""
+        for item in [i for i in self._items if i not in items]:
+            self.remove(item)
+
+    def clear(self):
+        self._cells.clear()
+        self._items.clear()
+        self._awake.clear()
+
+    def _unlink(self, item, entry):
+        cx0, cy0, cx1, cy1 = entry[:4]
+        cells = self._cells
+        awake = self._awake
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                cell = cells[cx, cy]
+                del cell[item]
+                if not cell:
+                    del cells[cx, cy]
+                if not entry[5]:
+                    count = awake[cx, cy] - 1
+                    if count:
+                        awake[cx, cy] = count
+                    else:
+                        del awake[cx, cy]
+
+    def query(self, left, top, right, bottom):
+        """return the items sharing a cell with the given bounds, each listed once"""
+        cx0, cy0, cx1, cy1 = self.cell_range(left, top, right, bottom)
+        cells = self._cells
+        found = {}
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                cell = cells.get((cx, cy))
+                if cell:
+                    found.update(cell)
+        return list(found)
+
+    def pairs(self, group_a=None, group_b=None, layers=None):
+        """yield each unordered pair of items that share at least one cell exactly once
+
+        With no groups every pair is yielded. With group_a only, pairs within that group
+        are yielded. With both, pairs are yielded as (item of group_a, item of group_b).
+        With layers, a layers.LayerMatrix whose layers are the groups, every pair of
+        layers it enables is yielded in one pass, in the order it enables them.
+
+        A pair sharing several cells is only reported from the cell holding the top-left
+        corner of the overlap of their cell ranges, so no per-tick seen-set is needed.
+        Only cells with an item that isn't resting are visited.
+        """
+        items = self._items
+        cells = self._cells
+        cross = group_b is not None and group_b != group_a
+        masks = layers.masks if layers is not None else None
+        for cx, cy in self._awake:
+            cell = cells[cx, cy]
+            if len(cell) < 2:
+                continue
+            members = list(cell)
+            count = len(members)
+            for i in range(count):
+                a = members[i]
+                ea = items[a]
+                for j in range(i + 1, count):
+                    b = members[j]
+                    eb = items[b]
+                    if cx != max(ea[0], eb[0]) or cy != max(ea[1], eb[1]):
+                        continue
+                    if ea[5] and eb[5]:
+                        continue
+                    if masks is not None:
+                        layer_a = ea[4]
+                        layer_b = eb[4]
+                        if masks[layer_a] >> layer_b & 1:
+                            yield (b, a) if layers.swapped(layer_a, layer_b) else (a, b)
+                    elif cross:
+                        if ea[4] == group_a and eb[4] == group_b:
+                            yield a, b
+                        elif eb[4] == group_a and ea[4] == group_b:
+                            yield b, a
+                    elif group_a is None or (ea[4] == group_a and eb[4] == group_a):
+                        yield a, b
+
+
+
+class SlotHash:
+
+    def __init__(self, cell_size):
+        """uniform grid broadphase over the slots of a PuckWorld, refiled from its arrays each tick
+
+        Where SpatialHash moves its items one at a time, sync() takes the bounds of every body
+        as arrays and files them all at once: one (cell, slot) entry per cell a body overlaps,
+        sorted by cell key, so the bodies sharing a cell are one contiguous run. pairs() and
+        query() work on those runs with numpy, so neither costs Python per body, and a body
+        that moved is always in the right cells.
+
+        Resting slots stay in the grid, but pairs() never pairs two of them.
+
+        Args:
+            cell_size: width and height of a grid cell in pixels
+        """
+        self.cell_size = cell_size
+        self._keys = _EMPTY                     # cell key of each entry, sorted
+        self._slots = _EMPTY                    # slot of each entry
+        self._left = _EMPTY                     # column of the top-left cell of the entry's body
+        self._top = _EMPTY                      # row of the top-left cell of the entry's body
+        self._groups = _EMPTY                   # group of the entry's body
+        self._resting = np.zeros(0, dtype=bool)
+        self._count = 0                         # slots filed by the last sync()
+
+    def __len__(self):
+        return self._count
+
+    def sync(self, slots, left, top, right, bottom, groups=None, resting=None):
+        """file every given slot under the cells its bounds overlap, replacing the last sync
+
+        Args:
+            slots: slots to file, each once
+            left, top, right, bottom: arrays of bounds, one per slot
+            groups: array of small ints, e.g. collision layers, one per slot; 0 if None
+            resting: bool array, True for slots that are resting; none are if None
+        """
+        slots = np.asarray(slots, dtype=np.int64)
+        count = len(slots)
+        size = self.cell_size
+        cx0 = np.floor_divide(left, size).astype(np.int64)
+        cy0 = np.floor_divide(top, size).astype(np.int64)
+        columns = np.floor_divide(right, size).astype(np.int64) - cx0 + 1
+        rows = np.floor_divide(bottom, size).astype(np.int64) - cy0 + 1
+        # one entry per covered cell, walking each body's cells row by row
+        cells = columns * rows
+        body = np.repeat(np.arange(count), cells)
+        offset = np.arange(len(body)) - np.repeat(np.cumsum(cells) - cells, cells)
+        keys = (cx0[body] + offset // rows[body]) * CELL_STRIDE + cy0[body] + offset % rows[body]
+        order = np.argsort(keys, kind='stable')
+        body = body[order]
+        self._keys = keys[order]
+        self._slots = slots[body]
+        self._left = cx0[body]
+        self._top = cy0[body]
+        self._groups = (np.zeros(count, dtype=np.int64) if groups is None else np.asarray(groups))[body]
+        self._resting = (np.zeros(count, dtype=bool) if resting is None else np.asarray(resting, dtype=bool))[body]
+        self._count = count
+
+    def clear(self):
+        self.sync(_EMPTY, _EMPTY, _EMPTY, _EMPTY, _EMPTY)
+
+    def query(self, left, top, right, bottom):
+        """slots sharing a cell with the given bounds, ascending and each listed once"""
+        size = self.cell_size
+        cx0, cy0 = int(left // size), int(top // size)
+        cx1, cy1 = int(right // size), int(bottom // size)
+        columns = np.arange(cx0, cx1 + 1, dtype=np.int64) * CELL_STRIDE
+        starts = np.searchsorted(self._keys, columns + cy0, 'left')
+        ends = np.searchsorted(self._keys, columns + cy1, 'right')
+        found = [self._slots[start:end] for start, end in zip(starts.tolist(), ends.tolist()) if end > start]
+        return np.unique(np.concatenate(found)) if found else _EMPTY
+
+    def pairs(self, layers=None):
+        """every unordered pair of slots sharing at least one cell, once, as two arrays
+
+        Like SpatialHash.pairs(), a pair sharing several cells is only taken from the cell
+        holding the top-left corner of the overlap of their cell ranges. With layers, a
+        layers.LayerMatrix whose layers are the groups, only pairs of layers it enables are
+        returned, each as (slot of the first layer, slot of the second).
+
+        Returns:
+            (first, second) arrays of slots
+        """
+        keys = self._keys
+        first = []
+        second = []
+        # the entries of a cell are contiguous, so pair each entry with those 1, 2, ... after it
+        distance = 1
+        while distance < len(keys):
+            shared = np.flatnonzero(keys[distance:] == keys[:-distance])
+            if not len(shared):
+                break
+            first.append(shared)
+            second.append(shared + distance)
+            distance += 1
+        if not first:
+            return _EMPTY, _EMPTY
+        i = np.concatenate(first)
+        j = np.concatenate(second)
+        column = np.maximum(self._left[i], self._left[j])
+        row = np.maximum(self._top[i], self._top[j])
+        keep = (keys[i] == column * CELL_STRIDE + row) & ~(self._resting[i] & self._resting[j])
+        i = i[keep]
+        j = j[keep]
+        if layers is not None:
+            group_i = self._groups[i]
+            group_j = self._groups[j]
+            masks = np.array(layers.masks, dtype=np.int64)
+            keep = (masks[group_i] >> group_j & 1).astype(bool)
+            swapped = np.array([[layers.swapped(a, b) for b in range(len(layers))] for a in range(len(layers))],
+                               dtype=bool).reshape(len(layers), len(layers))
+            swap = swapped[group_i, group_j]
+            i, j = np.where(swap, j, i)[keep], np.where(swap, i, j)[keep]
+        return self._slots[i], self._slots[j]
+
+
+logger.debug("imported")
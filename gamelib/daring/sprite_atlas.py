@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+import logging
+
+import pygame
+
+logger = logging.getLogger(__name__)
+logger.debug("importing...")
+
+
+class SpriteAtlas:
+
+    def __init__(self, page_size=(256, 256)):
+        """pre-rasterized sprites packed into shared atlas pages, drawn in batched blits
+
+        A sprite is rasterized the first time it is asked for and kept as a subsurface of
+        an atlas page. Pages are filled shelf by shelf, left to right; a sprite that
+        doesn't fit starts a new shelf, or a new page when the page is full.
+
+        Each frame:
+            batch = []
+            atlas.add(batch, atlas.circle(radius, color), center) for each thing to draw
+            atlas.draw(surface, batch)
+
+        Args:
+            page_size: (width, height) of each atlas page
+        """
+        self.page_size = page_size
+        self.pages = []
+        self._sprites = {}          # key -> (subsurface, offset x, offset y)
+        self._shelf_x = 0           # where the next sprite goes on the current shelf
+        self._shelf_y = 0
+        self._shelf_height = 0
+
+    def circle(self, radius, color):
+        """the filled circle sprite for (radius, color), rasterized on first use
+
+        Returns:
+            (sprite, offset x, offset y): blit sprite at center + offset
+        """
+        radius = int(radius)
+        key = ('circle', radius, tuple(color))
+        sprite = self._sprites.get(key)
+        if sprite is None:
+            size = 2 * radius + 2
+            page, x, y = self._reserve(size, size)
+            center = (x + radius, y + radius)
+            # pygame.draw reports the pixels it touched; the sprite is exactly those
+            rect = pygame.draw.circle(page, color, center, radius)
+            sprite = (page.subsurface(rect), rect.x - center[0], rect.y - center[1])
+            self._sprites[key] = sprite
+        return sprite
+
+    def _reserve(self, width, height):
+        page_width, page_height = self.page_size
+        if width > page_width or height > page_height:
+            # too big to share a page, so the page is full once it's placed
+            page = self._new_page(max(width, page_width), max(height, page_height))
+            self._shelf_y = page.get_height()
+            return page, 0, 0
+        if self.pages and self._shelf_x + width > self.pages[-1].get_width():
+            self._shelf_x = 0
+            self._shelf_y += self._shelf_height
+            self._shelf_height = 0
+        if not self.pages or self._shelf_y + height > self.pages[-1].get_height():
+            self._new_page(page_width, page_height)
+        x, y = self._shelf_x, self._shelf_y
+        self._shelf_x += width
+        self._shelf_height = max(self._shelf_height, height)
+        return self.pages[-1], x, y
+
+    def _new_page(self, width, height):
+        page = pygame.Surface((width, height), pygame.SRCALPHA)
+        self.pages.append(page)
+        self._shelf_x = self._shelf_y = self._shelf_height = 0
+        return page
+
+    @staticmethod
+    def add(batch, sprite, center):
+        """append sprite drawn at center to batch and return the rect it will cover"""
+        surface, offset_x, offset_y = sprite
+        position = (int(center[0]) + offset_x, int(center[1]) + offset_y)
+        batch.append((surface, position))
+        return surface.get_rect(topleft=position)
+
+    @staticmethod
+    def draw(surface, batch):
+        """blit a whole batch of (sprite, position) in one call"""
+        if hasattr(surface, 'fblits'):
+            surface.fblits(batch)
+        else:
+            surface.blits(batch, doreturn=False)
+
+    def clear(self):
+        self.pages = []
+        self._sprites.clear()
+        self._shelf_x = self._shelf_y = self._shelf_height = 0
+
+
+_atlas = None
+
+
+def get_atlas():
+    """the atlas shared by the engine and every context"""
+    global _atlas
+    if _atlas is None:
+        _atlas = SpriteAtlas()
+    return _atlas
+
+
+logger.debug("imported")
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+import logging
+
+import pygame
+
+logger = logging.getLogger(__name__)
+logger.debug("importing...")
+
+
+class StaticLayer:
+
+    def __init__(self, size, draw):
+        """a surface caching everything that doesn't move, drawn once and blitted in one call
+
+        Args:
+            size: (width, height) of the layer
+            draw: callable, draw(surface) draws the whole layer onto surface
+        """
+        self.surface = pygame.Surface(size)
+        self._draw = draw
+        self._signature = None
+        self.valid = False
+
+    def invalidate(self):
+        self.valid = False
+
+    def refresh(self, signature=None):
+        """redraw the layer if it was invalidated or signature differs from the last one
+
+        Args:
+            signature: any comparable summary of what the layer shows, e.g. zone counts
+                and bumper radii; a change means the cached drawing is stale
+
+        Returns:
+            True if the layer was redrawn
+        """
+        if self.valid and signature == self._signature:
+            return False
+        self._draw(self.surface)
+        self._signature = signature
+        self.valid = True
+        return True
+
+    def blit(self, target, area=None):
+        """copy the layer onto target, all of it or only area"""
+        if area is None:
+            target.blit(self.surface, (0, 0))
+        else:
+            target.blit(self.surface, area, area)
+
+
+logger.debug("imported")
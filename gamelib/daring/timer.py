@@ -1,9 +1,12 @@
 # -*- coding: utf-8 -*-
+import heapq
+import itertools
 import logging
 
 import pygame
 
 from gamelib.settings import Runtime
+from gamelib.daring.tracer import get_tracer
 
 logger = logging.getLogger(__name__)
 logger.debug("importing...")
@@ -11,37 +14,125 @@ logger.debug("importing...")
 
 class Timer:
 
-    def __init__(self):
-        self._timers = []
+    def __init__(self, clock=None):
+        """schedules TimedItems on a priority queue ordered by when they are next due
+
+        update() reads the clock once and only touches the items that fire, so a frame
+        costs O(fired * log n) however many timers are waiting. Each item fires at most
+        once per update(), so one with a 0 interval fires every frame. Removed and
+        cancelled items are dropped lazily when they reach the front of the queue.
+
+        Args:
+            clock: callable returning the current time in milliseconds; defaults to
+                pygame.time.get_ticks
+        """
+        self._clock = clock if clock else pygame.time.get_ticks
+        self._queue = []                    # (due, sequence, item)
+        self._sequence = itertools.count()  # breaks ties in the order items were scheduled
+        self._timers = {}                   # scheduled items, in the order they were added
+        self._paused_at = None
+        self._tracer = get_tracer()
+
+    def now(self):
+        return self._paused_at if self._paused_at is not None else self._clock()
 
     def add(self, timed_item):
-        self._timers.append(timed_item)
+        """schedule timed_item to fire interval ms from now; returns it as its cancellation handle"""
+        if timed_item.interval < 0:
+            raise ValueError(f"TimedItem interval must not be negative, got {timed_item.interval}")
+        now = self.now()
+        timed_item._mark = now
+        timed_item._timer = self
+        self._timers[timed_item] = None
+        self._push(timed_item, now + timed_item.interval)
+        return timed_item
+
+    def schedule(self, interval, callback, args=None, kwargs=None, repeat=False):
+        """create and add a TimedItem; one-shot unless repeat is True"""
+        return self.add(TimedItem(interval, callback, args, kwargs, repeat))
+
+    def _push(self, timed_item, due):
+        sequence = next(self._sequence)
+        timed_item._due = due
+        timed_item._sequence = sequence
+        heapq.heappush(self._queue, (due, sequence, timed_item))
 
     def get_timers(self):
         return list(self._timers)
 
     def update(self):
-        timers = []
-        for t in self._timers:
-            t.tick()
-            timers.append(t)
-        return timers
+        """fire every item that is due and return the list of items that fired"""
+        fired = []
+        if self._paused_at is not None:
+            return fired
+        now = self._clock()
+        queue = self._queue
+        tracer = self._tracer
+        repeats = []    # rescheduled after the loop, or a 0 interval item would be due again at once
+        while queue and queue[0][0] <= now:
+            due, sequence, t = heapq.heappop(queue)
+            if t._sequence != sequence or t not in self._timers:
+                continue    # stale entry of a removed, paused or rescheduled item
+            dt = now - t._mark
+            t._mark = now
+            t.dt = dt
+            if t.repeat:
+                t._due = now + t.interval
+                repeats.append((t, sequence))
+            else:
+                del self._timers[t]
+                t._timer = None
+            fired.append(t)
+            if tracer.enabled:
+                with tracer.span(getattr(t.callback, '__qualname__', 'timer'), 'timer'):
+                    t.callback(dt, *t.args, **t.kwargs)
+            else:
+                t.callback(dt, *t.args, **t.kwargs)
+        for t, sequence in repeats:
+            # unless a callback removed, paused or rescheduled it
+            if t._sequence == sequence and t in self._timers:
+                self._push(t, t._due)
+        return fired
 
     def clear(self):
-        del self._timers[:]
+        for t in self._timers:
+            t._timer = None
+        self._timers.clear()
+        del self._queue[:]
         return self.get_timers()
 
     def remove(self, timer):
-        try:
-            self._timers.remove(timer)
-        except ValueError:
-            pass
+        if timer in self._timers:
+            del self._timers[timer]
+            timer._timer = None
+            timer._sequence = None
         return self.get_timers()
 
+    def pause(self):
+        """stop the clock for every item; nothing fires until resume()"""
+        if self._paused_at is None:
+            self._paused_at = self._clock()
+
+    def resume(self):
+        if self._paused_at is None:
+            return
+        offset = self._clock() - self._paused_at
+        self._paused_at = None
+        # shifting every due time by the same amount keeps the heap ordered
+        self._queue = [(due + offset, sequence, t) for due, sequence, t in self._queue]
+        for t in self._timers:
+            t._mark += offset
+            if t._due is not None:
+                t._due += offset
+
+    @property
+    def paused(self):
+        return self._paused_at is not None
+
 
 class TimedItem:
 
-    def __init__(self, interval, callback, args=None, kwargs=None):
+    def __init__(self, interval, callback, args=None, kwargs=None, repeat=True):
         """create a timer that fires a callback every interval
 
         Args:
@@ -49,16 +140,23 @@ class TimedItem:
             callback: callable, must accept dt as its first argument
             args: sequence, passed to callback as *args
             kwargs: map, passed to callback as **kwargs
+            repeat: bool, False fires the callback once and then removes the item
         """
         self.callback = callback
         self.args = args if args else []
         self.kwargs = kwargs if kwargs else {}
+        self.repeat = repeat
 
         self.interval = interval                    # milliseconds
         self._start = pygame.time.get_ticks()       # milliseconds
         self._mark = self._start                    # milliseconds
         self.dt = 0                                 # milliseconds
 
+        self._timer = None          # Timer this item is scheduled on
+        self._due = None            # milliseconds, when scheduled
+        self._sequence = None       # identifies the live queue entry
+        self._remaining = None      # milliseconds left when paused
+
     def tick(self):
         dt = pygame.time.get_ticks() - self._mark
         if dt >= self.interval:
@@ -66,5 +164,24 @@ class TimedItem:
             self.dt = dt
             self.callback(dt, *self.args, **self.kwargs)
 
+    @property
+    def scheduled(self):
+        return self._timer is not None and self._sequence is not None
+
+    def cancel(self):
+        if self._timer:
+            self._timer.remove(self)
+
+    def pause(self):
+        """stop this item's countdown; it keeps its place on its timer"""
+        if self.scheduled:
+            self._remaining = max(0, self._due - self._timer.now())
+            self._sequence = None
+
+    def resume(self):
+        if self._timer and self._sequence is None and self._remaining is not None:
+            self._timer._push(self, self._timer.now() + self._remaining)
+            self._remaining = None
+
 
 logger.debug("imported")
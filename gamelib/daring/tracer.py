@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+import collections
+import gc
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+logger.debug("importing...")
+
+# events kept by default; at a few dozen events a frame that is minutes of play
+CAPACITY = 200000
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+# handed out by every span() call while disabled
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'category', 'args', 'start')
+
+    def __init__(self, tracer, name, category, args):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        end = time.perf_counter_ns()
+        self.tracer.events.append(('X', self.name, self.category, self.start, end - self.start, self.args))
+        return False
+
+
+class Tracer:
+
+    def __init__(self, capacity=CAPACITY, enabled=False, trace_gc=True):
+        """records what the game loop spends its time on, for chrome://tracing or Perfetto
+
+        Spans are written as complete events (a begin time and a duration) rather than
+        separate begin and end events, so dropping the oldest events when the ring buffer
+        is full never leaves an end without its begin.
+
+        Args:
+            capacity: events kept; the oldest are dropped past this, so memory stays bounded
+            enabled: bool, start recording right away
+            trace_gc: also record garbage collector pauses while enabled
+        """
+        self.events = collections.deque(maxlen=capacity)     # (phase, name, category, ns, duration ns, args)
+        self.trace_gc = trace_gc
+        self.enabled = False
+        self._origin = time.perf_counter_ns()
+        self._gc_start = None
+        if enabled:
+            self.enable()
+
+    def enable(self):
+        if not self.enabled:
+            self.enabled = True
+            if self.trace_gc:
+                gc.callbacks.append(self._on_gc)
+
+    def disable(self):
+        if self.enabled:
+            self.enabled = False
+            if self._on_gc in gc.callbacks:
+                gc.callbacks.remove(self._on_gc)
+
+    def span(self, name, category='', args=None):
+        """context manager recording its block as one event"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, category, args)
+
+    def instant(self, name, category='', args=None):
+        """record a moment, e.g. a context being pushed"""
+        if self.enabled:
+            self.events.append(('i', name, category, time.perf_counter_ns(), 0, args))
+
+    def counter(self, name, values):
+        """record values, a {series: number} map, drawn as a graph under name"""
+        if self.enabled:
+            self.events.append(('C', name, '', time.perf_counter_ns(), 0, values))
+
+    def _on_gc(self, phase, info):
+        if phase == 'start':
+            self._gc_start = time.perf_counter_ns()
+        elif self._gc_start is not None:
+            end = time.perf_counter_ns()
+            self.events.append(('X', 'gc', 'gc', self._gc_start, end - self._gc_start,
+                                {'generation': info['generation'], 'collected': info['collected']}))
+            self._gc_start = None
+
+    def resize(self, capacity):
+        """keep up to capacity events from now on, dropping the oldest if there are more"""
+        self.events = collections.deque(self.events, maxlen=capacity)
+
+    def clear(self):
+        self.events.clear()
+
+    def trace_events(self):
+        """the recorded events as a list of trace event dicts, times in microseconds"""
+        pid = os.getpid()
+        tid = threading.main_thread().ident
+        origin = self._origin
+        result = [{'ph': 'M', 'name': 'process_name', 'pid': pid, 'tid': tid, 'args': {'name': 'daring'}}]
+        # snapshot first, a collection while building the dicts would add a gc event mid iteration
+        for phase, name, category, ns, duration, args in tuple(self.events):
+            event = {'ph': phase, 'name': name, 'cat': category, 'ts': (ns - origin) / 1000.0, 'pid': pid, 'tid': tid}
+            if phase == 'X':
+                event['dur'] = duration / 1000.0
+            elif phase == 'i':
+                event['s'] = 't'
+            if args:
+                event['args'] = args
+            result.append(event)
+        return result
+
+    def save(self, path):
+        """write the recorded events as Chrome trace event JSON"""
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': self.trace_events(), 'displayTimeUnit': 'ms'}, f)
+        logger.debug(f'saved {len(self.events)} trace events to {path}')
+
+
+_tracer = None
+
+
+def get_tracer():
+    """the tracer shared by the controller, timers, run stack and engine"""
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer()
+    return _tracer
+
+
+logger.debug("imported")
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+import logging
+import math
+
+import numpy as np
+
+from gamelib.daring import ccd
+from gamelib.daring.contact_events import ContactEvents
+from gamelib.daring.puck_world import KIND_COUNT
+from gamelib.daring.zone_index import AABBTree
+
+logger = logging.getLogger(__name__)
+logger.debug("importing...")
+
+# zone effects; a zone class names one of these in its effect attribute
+EFFECT_KILL = 'kill'            # body goes inactive
+EFFECT_FRICTION = 'friction'    # velocity is scaled by zone.friction
+EFFECT_BOOST = 'boost'          # zone.boost_velocity is added along the current direction of travel
+EFFECT_CONTACT = 'contact'      # zone.on_contact(batch) hears when bodies enter, stay in and leave; for stateful zones
+
+
+class ZoneEffects:
+
+    def __init__(self, zones):
+        """applies every zone's effect to every body of a PuckWorld in one batched pass
+
+        Each zone must provide rect, effect, overlap_threshold and kinds (the body kinds it
+        affects). A body is affected when the area of its bounding square that lies inside
+        the zone reaches overlap_threshold times its circle area, as in Zone.overlap_ratio().
+
+        Zones are indexed once in an AABBTree, so each body is only measured against the
+        zones its bounds actually overlap.
+
+        EFFECT_CONTACT zones have no effect of their own; their hits go to contacts, a
+        ContactEvents stream whose second side is the zone index, and each such zone is
+        subscribed to its own pairs through zone.on_contact.
+
+        Args:
+            zones: sequence of zones; zones never move, so build this once per level
+        """
+        self.zones = list(zones)
+        rects = [zone.rect for zone in self.zones]
+        self.left = np.array([r.left for r in rects], dtype=float)
+        self.top = np.array([r.top for r in rects], dtype=float)
+        self.right = np.array([r.right for r in rects], dtype=float)
+        self.bottom = np.array([r.bottom for r in rects], dtype=float)
+        self.threshold = np.array([zone.overlap_threshold for zone in self.zones], dtype=float)
+        self.tree = AABBTree(np.column_stack((self.left, self.top, self.right, self.bottom)))
+
+        self.affects = np.zeros((len(self.zones), KIND_COUNT), dtype=bool)
+        for i, zone in enumerate(self.zones):
+            self.affects[i, list(zone.kinds)] = True
+
+        # per zone effect parameters, 0 where the zone has no such parameter
+        self.friction = np.array([getattr(zone, 'friction', 0.0) for zone in self.zones], dtype=float)
+        self.boost_velocity = np.array([getattr(zone, 'boost_velocity', 0.0) for zone in self.zones], dtype=float)
+        self.effect = np.array([zone.effect for zone in self.zones], dtype=object)
+
+        self.contacts = ContactEvents(bodies=False)
+        for i, zone in enumerate(self.zones):
+            if zone.effect == EFFECT_CONTACT:
+                self.contacts.subscribe(zone.on_contact, second=i)
+
+    def overlap(self, world, slots, zones):
+        """overlap ratio of each (slot, zone) pair"""
+        radius = world.radius[slots]
+        x = world.x[slots]
+        y = world.y[slots]
+        overlap_x = np.minimum(x + radius, self.right[zones]) - np.maximum(x - radius, self.left[zones])
+        overlap_y = np.minimum(y + radius, self.bottom[zones]) - np.maximum(y - radius, self.top[zones])
+        area = np.clip(overlap_x, 0, None) * np.clip(overlap_y, 0, None)
+        return area / (math.pi * radius ** 2)
+
+    def hits(self, world):
+        """return (slots, zones), the index pairs where a zone affects a body this tick, ordered by slot then zone"""
+        slots = world.live_slots()
+        slots = slots[self.affects[:, world.kind[slots]].any(axis=0) & (world.radius[slots] > 0)]
+        radius = world.radius[slots]
+        x = world.x[slots]
+        y = world.y[slots]
+        queries, zones = self.tree.query_many(x - radius, y - radius, x + radius, y + radius)
+        slots = slots[queries]
+        hit = self.affects[zones, world.kind[slots]]
+        slots = slots[hit]
+        zones = zones[hit]
+        hit = self.overlap(world, slots, zones) >= self.threshold[zones]
+        return slots[hit], zones[hit]
+
+    def sweep(self, world, slots, dx, dy):
+        """fraction of (dx, dy) each body may move this step without passing through a zone that affects it
+
+        A body whose path enters a zone's deep region, where its bounds lie wholly inside
+        the zone, and leaves it again within one step is stopped where it enters, so the
+        next hits() sees it there. Meant for PuckWorld.sweep_tests.
+
+        Args:
+            world: PuckWorld
+            slots: bodies being swept
+            dx, dy: their motion this step
+        """
+        fraction = np.ones(len(slots))
+        radius = world.radius[slots]
+        x = world.x[slots]
+        y = world.y[slots]
+        queries, zones = self.tree.query_many(np.minimum(x, x + dx) - radius, np.minimum(y, y + dy) - radius,
+                                              np.maximum(x, x + dx) + radius, np.maximum(y, y + dy) + radius)
+        hit = self.affects[zones, world.kind[slots[queries]]]
+        queries = queries[hit]
+        zones = zones[hit]
+        if not len(queries):
+            return fraction
+        # the deep region shrinks the zone by the radius, down to its middle for zones smaller than the body
+        r = radius[queries]
+        middle_x = (self.left[zones] + self.right[zones]) * 0.5
+        middle_y = (self.top[zones] + self.bottom[zones]) * 0.5
+        enter, leave = ccd.segment_aabb_toi(
+            x[queries], y[queries], dx[queries], dy[queries],
+            np.minimum(self.left[zones] + r, middle_x), np.minimum(self.top[zones] + r, middle_y),
+            np.maximum(self.right[zones] - r, middle_x), np.maximum(self.bottom[zones] - r, middle_y))
+        tunnels = (enter > 0) & (enter <= leave) & (leave < 1)
+        np.minimum.at(fraction, queries[tunnels], enter[tunnels])
+        return fraction
+
+    def apply(self, world):
+        slots, zones = self.hits(world)
+        effect = self.effect[zones]
+        # contacts are updated even with no hits, so the bodies that left hear about it
+        contact = effect == EFFECT_CONTACT
+        self.contacts.update(world, slots[contact], zones[contact])
+        if not len(slots):
+            return
+        for name, handler in _effects.items():
+            mine = effect == name
+            if mine.any():
+                handler(self, world, slots[mine], zones[mine])
+
+
+def _kill(effects, world, slots, zones):
+    world.active[slots] = False
+
+
+def _friction(effects, world, slots, zones):
+    # overlapping friction zones multiply
+    np.multiply.at(world.vx, slots, effects.friction[zones])
+    np.multiply.at(world.vy, slots, effects.friction[zones])
+
+
+def _boost(effects, world, slots, zones):
+    speed = np.hypot(world.vx[slots], world.vy[slots])
+    moving = speed != 0
+    slots = slots[moving]
+    zones = zones[moving]
+    # boosts along the direction of travel add up without turning the body
+    total = np.zeros(world.count)
+    np.add.at(total, slots, effects.boost_velocity[zones])
+    boosted = np.unique(slots)
+    gain = total[boosted] / np.hypot(world.vx[boosted], world.vy[boosted])
+    world.vx[boosted] += world.vx[boosted] * gain
+    world.vy[boosted] += world.vy[boosted] * gain
+    for zone in np.unique(zones):
+        effects.zones[zone].mark_boosted(slots[zones == zone])
+
+
+_effects = {
+    EFFECT_KILL: _kill,
+    EFFECT_FRICTION: _friction,
+    EFFECT_BOOST: _boost,
+}
+
+
+logger.debug("imported")
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+logger.debug("importing...")
+
+
+class AABBTree:
+
+    def __init__(self, boxes):
+        """static bounding volume hierarchy over axis aligned boxes that never move
+
+        Built once, top down, splitting at the median center along the longest axis, and
+        stored as flat arrays. Every leaf holds one box.
+
+        Args:
+            boxes: sequence of (left, top, right, bottom); items are reported by their index
+        """
+        boxes = np.asarray(boxes, dtype=float).reshape(-1, 4)
+        self.size = len(boxes)
+        node_count = max(2 * self.size - 1, 0)
+        self.left = np.zeros(node_count)
+        self.top = np.zeros(node_count)
+        self.right = np.zeros(node_count)
+        self.bottom = np.zeros(node_count)
+        self.child_a = np.full(node_count, -1, dtype=np.intp)
+        self.child_b = np.full(node_count, -1, dtype=np.intp)
+        self.item = np.full(node_count, -1, dtype=np.intp)     # box index at leaves, -1 for inner nodes
+        self._next = 0
+        if self.size:
+            self._build(boxes, np.arange(self.size))
+
+    def _build(self, boxes, items):
+        node = self._next
+        self._next += 1
+        chunk = boxes[items]
+        self.left[node] = chunk[:, 0].min()
+        self.top[node] = chunk[:, 1].min()
+        self.right[node] = chunk[:, 2].max()
+        self.bottom[node] = chunk[:, 3].max()
+        if len(items) == 1:
+            self.item[node] = items[0]
+            return node
+        centers_x = chunk[:, 0] + chunk[:, 2]
+        centers_y = chunk[:, 1] + chunk[:, 3]
+        if self.right[node] - self.left[node] >= self.bottom[node] - self.top[node]:
+            order = np.argsort(centers_x, kind='stable')
+        else:
+            order = np.argsort(centers_y, kind='stable')
+        half = len(items) // 2
+        self.child_a[node] = self._build(boxes, items[order[:half]])
+        self.child_b[node] = self._build(boxes, items[order[half:]])
+        return node
+
+    def query(self, left, top, right, bottom):
+        """indices of the boxes overlapping the given bounds"""
+        found = []
+        if not self.size:
+            return found
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            if (left >= self.right[node] or right <= self.left[node] or
+                    top >= self.bottom[node] or bottom <= self.top[node]):
+                continue
+            if self.item[node] >= 0:
+                found.append(int(self.item[node]))
+            else:
+                stack.append(self.child_b[node])
+                stack.append(self.child_a[node])
+        return found
+
+    def query_many(self, left, top, right, bottom):
+        """query many bounds at once, walking the tree one level per pass for all of them
+
+        Args:
+            left, top, right, bottom: equal length arrays of query bounds
+
+        Returns:
+            (queries, items): index arrays of every overlapping (query, box) pair,
+            ordered by query then box
+        """
+        left = np.asarray(left, dtype=float)
+        top = np.asarray(top, dtype=float)
+        right = np.asarray(right, dtype=float)
+        bottom = np.asarray(bottom, dtype=float)
+        if not self.size or not len(left):
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+        queries = np.arange(len(left))
+        nodes = np.zeros(len(left), dtype=np.intp)
+        found_queries = []
+        found_items = []
+        while len(queries):
+            keep = ((left[queries] < self.right[nodes]) & (right[queries] > self.left[nodes]) &
+                    (top[queries] < self.bottom[nodes]) & (bottom[queries] > self.top[nodes]))
+            queries = queries[keep]
+            nodes = nodes[keep]
+            leaf = self.item[nodes] >= 0
+            found_queries.append(queries[leaf])
+            found_items.append(self.item[nodes[leaf]])
+            inner = ~leaf
+            queries = np.concatenate((queries[inner], queries[inner]))
+            nodes = np.concatenate((self.child_a[nodes[inner]], self.child_b[nodes[inner]]))
+        queries = np.concatenate(found_queries)
+        items = np.concatenate(found_items)
+        order = np.lexsort((items, queries))
+        return queries[order], items[order]
+
+
+logger.debug("imported")
@@ -24,11 +24,13 @@ class ContextOutro(Context):
         pygame.display.set_caption(f'Context: Outro (press any key) | {int(round(Runtime.clock.get_fps()))} fps')
         self.handle_events()
 
-    def draw(self):
-        screen = pygame.display.get_surface()
-        screen.fill((0, 0, 0))
-        screen.blit(self.image, self.rect)
-        pygame.display.flip()
+    def draw(self, alpha):
+        # nothing moves, so only the first frame is drawn and presented
+        if self.renderer.full_redraw:
+            screen = pygame.display.get_surface()
+            screen.fill((0, 0, 0))
+            screen.blit(self.image, self.rect)
+        self.renderer.present()
 
     def handle_events(self):
         for e in pygame.event.get():
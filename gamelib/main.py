@@ -4,8 +4,10 @@ import logging
 import pygame
 
 from gamelib import level_flow
-from gamelib.settings import Runtime, DisplaySettings, AudioSettings
+from gamelib.settings import Runtime, DisplaySettings, AudioSettings, ProfileSettings, TimeSettings, TraceSettings
 from gamelib.daring import controller, timer, context
+from gamelib.daring.profiler import Profiler
+from gamelib.daring.tracer import get_tracer
 
 logger = logging.getLogger(__name__)
 logger.debug("importing...")
@@ -20,6 +22,13 @@ def main():
                             DisplaySettings.depth, DisplaySettings.display, DisplaySettings.vsync)
 
     Runtime.clock = pygame.Clock()
+    Runtime.timer = timer.Timer()
+    Runtime.profiler = Profiler(ProfileSettings.enabled, ProfileSettings.window, ProfileSettings.history,
+                                budget_ms=1000.0 / TimeSettings.fps if TimeSettings.fps else None)
+    tracer = get_tracer()
+    if TraceSettings.enabled:
+        tracer.resize(TraceSettings.capacity)
+        tracer.enable()
 
     logger.debug('starting game loop')
     try:
@@ -34,6 +43,11 @@ def main():
                 pass
     except StopIteration:
         return
+    finally:
+        if ProfileSettings.enabled and ProfileSettings.export_path:
+            Runtime.profiler.export(ProfileSettings.export_path)
+        if tracer.enabled:
+            tracer.save(TraceSettings.path)
     logger.debug('exited game loop')
 
 
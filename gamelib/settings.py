@@ -20,15 +20,30 @@ class Runtime:
     clock = None            # global clock
     dt = 0                  # time used in the previous tick
     timer = None            # persistent global timers; don't use this for levels, instead make a local timer
+    profiler = None         # frame profiler, see ProfileSettings
 
 
 class TimeSettings:
-    # todo: these timings are decoupled; need to implement interpolated rendering
-    ups = 30        # updates per second; i.e. the game's time step
-    fps = 30        # frames per second; i.e. the game's render step
+    ups = 30        # updates per second; i.e. the game's fixed time step
+    fps = 30        # frames per second; i.e. the render cap, 0 renders as fast as the display allows
+    max_updates = 5         # most updates run per rendered frame before game time is dropped
+    max_frame_time = 250    # milliseconds; longer frames are clamped so a stall can't spiral
     clock_nice = True       # when clock_throttle > 0, nice=True uses Clock.tick(), else Clock.tick_busy_loop()
 
 
+class ProfileSettings:
+    enabled = False         # time the update and render scopes of every frame
+    window = 240            # frames the rolling p50/p95/p99 are taken over
+    history = 3600          # frames kept for export_path; older ones are dropped
+    export_path = None      # .csv or .json file the per-frame times are written to on exit
+
+
+class TraceSettings:
+    enabled = False         # record Chrome trace events (chrome://tracing, ui.perfetto.dev)
+    capacity = 200000       # events kept; older ones are dropped so long soak tests stay bounded
+    path = 'trace.json'     # written on exit
+
+
 class DisplaySettings:
     width = 800
     height = 600